@@ -6,14 +6,33 @@ import json
 import os
 import re
 import numpy as np
-from PIL import Image, ImageTk, ImageDraw
-import face_recognition
+from PIL import Image, ImageTk
 from datetime import datetime, timedelta
-import shutil
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 
 import database_manager as db
-from face_system import FaceSystem
+from camera_manager import CameraManager
+from face_matcher import TOLERANCE
+from versioned_gallery import VersionedGallery
+from face_system import DEFAULT_SCALE, FaceSystem, MotionGate, reuse_buffer
+from sharded_matcher import MATCHER_SHARDS, ShardedMatcher
+from gallery_nodes import GALLERY_NODES, GalleryCoordinator, parse_address
+from gallery_watcher import WATCH_INTERVAL, GalleryWatcher
+from change_log import apply_event
+from frame_governor import FrameGovernor
+from video_renderer import VideoRenderer
+from virtual_table import VirtualTable
+from user_search import UserSearchIndex
+from thumbnail_cache import ThumbnailCache
+from image_loader import AsyncImageLoader, circular
+from breach_archive import BREACH_RETENTION_DAYS, BreachArchive
+from retention import RetentionScheduler
+from snapshot_store import SnapshotStore
+from encoding_cache import EncodingCache, analyze_image_bytes
+
+BREACH_DAYS_PER_BATCH = 3
 
 ctk.set_appearance_mode("Dark")
 
@@ -29,16 +48,24 @@ class FaceApp(ctk.CTk):
         # Initialize variables first
         self.bg_label = None
         self.bg_photo = None
-        self.cap = None
+        self.camera = CameraManager()
+        self.camera_job = None
+        self.last_frame_id = 0
         self.current_frame = None
+        self.display_buffers = {}
+        self.detector = ThreadPoolExecutor(max_workers=1)
+        self.detect_job = None
+        self.detect_generation = 0
         self.current_user = None
         self.current_user_type = None
         self.last_face_status = "Initializing"
         self.face_locations = []
+        self.face_scale = 0.5
         self.login_attempts = {}
         self.image_captured = False
         self.captured_encoding = None
         self.captured_frame = None
+        self.captured_bytes = None
         
         # Set background
         self.set_background()
@@ -46,12 +73,128 @@ class FaceApp(ctk.CTk):
         # Initialize system
         db.init_database()
         self.init_folder_structure()
-        self.cleanup_old_data()
+        # Expired breach logs and login snapshots are removed in the background
+        self.retention = RetentionScheduler()
+        self.retention.start()
+        users = db.get_all_users()
+        self.user_search = None     # built in the background when the user list opens
+        self.search_build = None    # future of that build
+        self.search_backlog = []    # changes made while it runs
+        self.indexer = ThreadPoolExecutor(max_workers=1)
+        db.changes.listeners.append(self.search_event)
+        self.thumbs = ThumbnailCache()
+        self.images = AsyncImageLoader(self, self.thumbs)
+        self.breach_archive = BreachArchive()
+        self.snapshots = SnapshotStore()
+        self.encoding_cache = EncodingCache()
+        self.search_job = None
+        self.watcher = None
+        self.reported_pending = 0
+        if GALLERY_NODES:
+            self.gallery = GalleryCoordinator([parse_address(a) for a in GALLERY_NODES])
+        elif MATCHER_SHARDS:
+            self.gallery = ShardedMatcher.from_dataframe(users, MATCHER_SHARDS)
+        else:
+            self.gallery = VersionedGallery.from_dataframe(users)
+        self.gallery.ensure_projection()
+        if not GALLERY_NODES:
+            # Pick up enrollments made by other workstations sharing the database
+            self.watcher = GalleryWatcher(users.to_dict("records"))
+            self.watcher.start()
+            self.after(int(WATCH_INTERVAL * 1000), self.apply_gallery_changes)
         
         self.face = FaceSystem()
+        self.motion_gate = MotionGate()
+        self.governor = FrameGovernor()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self.build_home()
 
+    def on_close(self):
+        """Release the camera device and close the window"""
+        self.stop_camera()
+        self.camera.close()
+        self.detector.shutdown(wait=False)
+        self.indexer.shutdown(wait=False)
+        self.images.shutdown()
+        self.retention.stop()
+        self.encoding_cache.close()
+        if isinstance(self.gallery, (ShardedMatcher, GalleryCoordinator)):
+            self.gallery.close()
+        if self.watcher:
+            self.watcher.stop()
+        self.destroy()
+
+    def apply_gallery_changes(self):
+        """Apply changes found by the watcher thread to the in-memory gallery"""
+        events = self.watcher.drain()
+        if isinstance(self.gallery, VersionedGallery):
+            self.gallery.apply_events(events)
+        else:
+            for event in events:
+                apply_event(self.gallery, event)
+        for event in events:
+            self.search_event(event)
+        if events:
+            self.gallery.ensure_projection()
+        self.after(int(WATCH_INTERVAL * 1000), self.apply_gallery_changes)
+
+    def report_gallery_sync(self):
+        """Warn when a change could not reach an unreachable matcher node yet"""
+        pending = getattr(self.gallery, "pending_writes", 0)
+        if pending > self.reported_pending:
+            msg.showwarning(
+                "Gallery Sync",
+                "Saved, but some matcher nodes are unreachable.\n"
+                f"{pending} change(s) will be applied when they are back."
+            )
+        self.reported_pending = pending
+
+    def start_search_index(self):
+        """Build the user search index on the indexer thread (seconds for large tables)"""
+        if self.user_search is not None or self.search_build is not None:
+            return
+        self.search_backlog = []
+        self.search_build = self.indexer.submit(
+            lambda: UserSearchIndex(db.get_all_users().to_dict("records")))
+        self.after(100, self.collect_search_index)
+
+    def collect_search_index(self):
+        """Install the finished search index, replaying changes made while it was built"""
+        if not self.search_build.done():
+            self.after(100, self.collect_search_index)
+            return
+        job, self.search_build = self.search_build, None
+        try:
+            index = job.result()
+        except Exception as e:
+            print(f"Search index error: {e}")
+            return
+        # Replaying is safe for changes the index already saw: add/update/delete are idempotent
+        for event in self.search_backlog:
+            index.apply(event)
+        self.search_backlog = []
+        self.user_search = index
+
+    def search_event(self, event):
+        """Keep the search index current, or hold the change until it is built"""
+        if self.user_search is not None:
+            self.user_search.apply(event)
+        elif self.search_build is not None:
+            self.search_backlog.append(event)
+
+    def sync_user_field(self, user_id, field):
+        """Copy a field just saved to the workbook into the gallery record
+        The watcher skips this process's own events, so nothing else does
+        """
+        user = db.get_user(user_id)
+        if user is None:
+            return
+        self.gallery.update_record(user_id, {field: user[field]})
+        self.report_gallery_sync()
+        if self.current_user and self.current_user.get("user_id") == user_id:
+            self.current_user[field] = user[field]
+
     def init_folder_structure(self):
         """Initialize complete folder structure"""
         folders = [
@@ -62,37 +205,6 @@ class FaceApp(ctk.CTk):
         for folder in folders:
             os.makedirs(folder, exist_ok=True)
 
-    def cleanup_old_data(self):
-        """Auto-cleanup old login images and breach logs"""
-        try:
-            breach_base = "images/breach_logs"
-            if os.path.exists(breach_base):
-                cutoff_date = datetime.now() - timedelta(days=30)
-                for date_folder in os.listdir(breach_base):
-                    folder_path = os.path.join(breach_base, date_folder)
-                    if os.path.isdir(folder_path):
-                        try:
-                            folder_date = datetime.strptime(date_folder, "%Y-%m-%d")
-                            if folder_date < cutoff_date:
-                                shutil.rmtree(folder_path)
-                        except:
-                            pass
-            
-            gallery_base = "images/gallery"
-            if os.path.exists(gallery_base):
-                cutoff_date = datetime.now() - timedelta(days=30)
-                for user_folder in os.listdir(gallery_base):
-                    user_path = os.path.join(gallery_base, user_folder)
-                    if os.path.isdir(user_path):
-                        for img_file in os.listdir(user_path):
-                            if img_file.startswith("login_"):
-                                img_path = os.path.join(user_path, img_file)
-                                file_time = datetime.fromtimestamp(os.path.getmtime(img_path))
-                                if file_time < cutoff_date:
-                                    os.remove(img_path)
-        except Exception as e:
-            print(f"Cleanup error: {e}")
-
     def set_background(self):
         """Set background image with optimization"""
         bg_files = ["background.jpeg", "background.jpg", "background.png"]
@@ -118,9 +230,7 @@ class FaceApp(ctk.CTk):
 
     def clear_screen(self):
         """Clear screen but keep background"""
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        self.stop_camera()
         self.current_frame = None
         self.image_captured = False
         
@@ -130,51 +240,65 @@ class FaceApp(ctk.CTk):
 
     def start_camera(self):
         """Start camera capture"""
-        if not self.cap or not self.cap.isOpened():
-            self.cap = cv2.VideoCapture(0)
-            if not self.cap.isOpened():
-                msg.showerror("Error", "Could not open camera")
-                return
-        self.update_camera()
+        if not self.camera.resume():
+            msg.showerror("Error", "Could not open camera")
+            return
+        self.motion_gate.keep_alive()
+        self.last_face_status = "Initializing"
+        self.face_locations = []
+        if self.camera_job is None:
+            self.update_camera()
 
     def stop_camera(self):
-        """Stop camera capture"""
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        """Stop camera capture (the device stays open for the next screen)"""
+        if self.camera_job is not None:
+            self.after_cancel(self.camera_job)
+            self.camera_job = None
+        # Results of a detection still running belong to the old screen
+        self.detect_generation += 1
+        self.camera.pause()
+
+    def pipeline_stats(self):
+        """Camera and detection instrumentation for diagnostics"""
+        return {
+            "camera": self.camera.stats(),
+            "motion_gate": self.motion_gate.stats(),
+            "governor": self.governor.settings()
+        }
 
     def update_camera(self):
         """Update camera feed"""
-        if not self.cap or not self.cap.isOpened():
+        self.camera_job = None
+        if not self.camera.active:
             return
 
-        ret, frame = self.cap.read()
-        if not ret:
-            self.after(30, self.update_camera)
-            return
+        started = time.perf_counter()
+        self.collect_detection()
 
-        self.current_frame = frame.copy()
-        enc, status, face_locs = self.face.process(frame)
-        self.last_face_status = status
-        self.face_locations = face_locs
-        
-        display_frame = frame.copy()
-        if face_locs:
-            for (top, right, bottom, left) in face_locs:
-                top *= 2
-                right *= 2
-                bottom *= 2
-                left *= 2
-                color = (0, 255, 0) if status == "Face OK" else (0, 165, 255)
-                cv2.rectangle(display_frame, (left, top), (right, bottom), color, 3)
-        
-        rgb = cv2.cvtColor(display_frame, cv2.COLOR_BGR2RGB)
-        img = Image.fromarray(rgb)
-        imgtk = ctk.CTkImage(img, size=(640, 480))
-        
-        if hasattr(self, 'camera_label') and self.camera_label.winfo_exists():
-            self.camera_label.configure(image=imgtk, text="")
-            self.camera_label.image = imgtk
+        frame_id, frame = self.camera.read()
+        if frame is None or frame_id == self.last_frame_id:
+            self.camera_job = self.after(self.governor.next_delay(started), self.update_camera)
+            return
+        self.last_frame_id = frame_id
+
+        # Shared with the camera buffer; capture handlers copy what they keep
+        self.current_frame = frame
+        if not self.motion_gate.check(frame):
+            self.last_face_status, self.face_locations = "Waiting for someone...", []
+        elif self.detect_job is None and self.governor.should_detect():
+            self.start_detection(frame)
+        status, face_locs = self.last_face_status, self.face_locations
+
+        display_started = time.perf_counter()
+        if hasattr(self, "camera_view") and self.camera_view.winfo_exists():
+            color = (0, 255, 0) if status == "Face OK" else (255, 165, 0)
+            boxes = [
+                ((left / self.face_scale, top / self.face_scale,
+                  right / self.face_scale, bottom / self.face_scale), color)
+                for (top, right, bottom, left) in face_locs
+            ]
+            self.camera_view.show(frame, boxes)
+            self.camera.mark_displayed(frame_id)
 
         if hasattr(self, 'status_label') and self.status_label.winfo_exists():
             self.status_label.configure(text=status)
@@ -182,7 +306,55 @@ class FaceApp(ctk.CTk):
         if hasattr(self, "btn_capture") and self.btn_capture.winfo_exists():
             self.btn_capture.configure(state="normal" if status == "Face OK" else "disabled")
 
-        self.after(30, self.update_camera)
+        if hasattr(self, "perf_label") and self.perf_label.winfo_exists():
+            self.perf_label.configure(
+                text=self.governor.summary(),
+                text_color="#ff6b6b" if self.governor.underpowered else "#666666"
+            )
+
+        self.governor.record_display(time.perf_counter() - display_started)
+        if self.motion_gate.idle:
+            delay = self.motion_gate.idle_interval_ms
+        else:
+            delay = self.governor.next_delay(started)
+        self.camera_job = self.after(delay, self.update_camera)
+
+    def start_detection(self, frame):
+        """Run FaceSystem.process on the detection thread so the preview keeps its rate"""
+        # The detection buffer is only refilled once the previous job finished
+        buf = reuse_buffer(self.display_buffers, "detect", frame.shape)
+        np.copyto(buf, frame)
+        scale = self.governor.scale
+
+        def run():
+            began = time.perf_counter()
+            result = self.face.process(buf, scale=scale)
+            return result, time.perf_counter() - began, scale
+
+        self.detect_job = (self.detector.submit(run), self.detect_generation)
+
+    def collect_detection(self):
+        """Apply the result of a finished detection job, if any"""
+        if self.detect_job is None or not self.detect_job[0].done():
+            return
+        job, generation = self.detect_job
+        self.detect_job = None
+        try:
+            (enc, status, face_locs), seconds, scale = job.result()
+        except Exception as e:
+            print(f"Detection error: {e}")
+            return
+
+        self.motion_gate.record_detection(seconds)
+        self.governor.record_detection(seconds)
+        if generation != self.detect_generation:
+            return
+
+        self.last_face_status = status
+        self.face_locations = face_locs
+        self.face_scale = scale
+        if face_locs:
+            self.motion_gate.keep_alive()
 
     # ================= VALIDATION =================
     def validate_email(self, email):
@@ -337,6 +509,21 @@ class FaceApp(ctk.CTk):
             font=("Segoe UI", 18, "bold")
         ).pack(pady=15)
 
+        ctk.CTkButton(
+            center_frame,
+            text="Verify with User ID",
+            command=self.show_verify,
+            fg_color="#1f2d3d",
+            hover_color="#2f3d4d",
+            border_width=2,
+            border_color="#3b7cb8",
+            text_color="#ffffff",
+            width=450,
+            height=60,
+            corner_radius=50,
+            font=("Segoe UI", 18, "bold")
+        ).pack(pady=15)
+
         ctk.CTkButton(
             center_frame,
             text="Manager Login",
@@ -752,17 +939,16 @@ class FaceApp(ctk.CTk):
         right_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
         right_frame.pack(side="right", fill="both", expand=True)
 
-        self.camera_label = ctk.CTkLabel(
+        self.camera_view = VideoRenderer(
             right_frame,
             text="📷 Camera Preview\n\nClick 'Capture from Webcam'\nto start camera",
             width=640,
             height=480,
             fg_color="#1a1a1a",
-            corner_radius=15,
             font=("Segoe UI", 14),
             text_color="#888888"
         )
-        self.camera_label.pack(pady=10)
+        self.camera_view.pack(pady=10)
 
         self.status_label = ctk.CTkLabel(
             right_frame,
@@ -772,9 +958,17 @@ class FaceApp(ctk.CTk):
         )
         self.status_label.pack(pady=10)
 
+        self.perf_label = ctk.CTkLabel(
+            right_frame,
+            text="",
+            font=("Segoe UI", 10),
+            text_color="#666666"
+        )
+        self.perf_label.pack()
+
     def start_camera_capture(self, user_type, user_id):
         """Start camera for capturing"""
-        self.camera_label.configure(text="Starting camera...", fg_color="#1a1a1a")
+        self.camera_view.show_text("Starting camera...")
         self.start_camera()
         self.btn_capture.configure(
             text="📸 Capture Image", 
@@ -786,26 +980,25 @@ class FaceApp(ctk.CTk):
         if self.current_frame is None:
             msg.showerror("Error", "No camera frame available")
             return
-            
-        enc, status, _ = self.face.process(self.current_frame)
+
+        # Copy on capture: the preview buffer is reused for later frames
+        frame = self.current_frame.copy()
+        enc, status, _ = self.face.process(frame, scale=DEFAULT_SCALE)
         
         if status != "Face OK":
             msg.showerror("Error", f"Cannot capture: {status}")
             return
 
         self.captured_encoding = enc
-        self.captured_frame = self.current_frame.copy()
+        self.captured_frame = frame
+        self.captured_bytes = None
         self.image_captured = True
         
         # Stop camera
         self.stop_camera()
         
         # Show captured image
-        rgb = cv2.cvtColor(self.captured_frame, cv2.COLOR_BGR2RGB)
-        img = Image.fromarray(rgb)
-        imgtk = ctk.CTkImage(img, size=(640, 480))
-        self.camera_label.configure(image=imgtk, text="")
-        self.camera_label.image = imgtk
+        self.camera_view.show(self.captured_frame)
         
         # Update status
         self.status_label.configure(text="✓ Image Captured Successfully!", text_color="#22c55e")
@@ -825,27 +1018,30 @@ class FaceApp(ctk.CTk):
         if not path:
             return
 
-        img = cv2.imread(path)
-        if img is None:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
             msg.showerror("Error", "Could not read image file")
             return
-            
-        enc, status, _ = self.face.process(img)
+
+        # Still-image analysis (no liveness), cached by content hash
+        img, enc, status, _ = analyze_image_bytes(self.face, data, self.encoding_cache)
         
         if status != "Face OK":
             msg.showerror("Error", f"Cannot use this image: {status}")
             return
+        if img is None:
+            img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
 
         self.captured_encoding = enc
         self.captured_frame = img
+        # Keep the original bytes so re-uploads of the same photo share one blob
+        self.captured_bytes = data
         self.image_captured = True
         
         # Show uploaded image
-        rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        pil_img = Image.fromarray(rgb)
-        imgtk = ctk.CTkImage(pil_img, size=(640, 480))
-        self.camera_label.configure(image=imgtk, text="")
-        self.camera_label.image = imgtk
+        self.camera_view.show(img)
         
         # Update status
         self.status_label.configure(text="✓ Image Uploaded Successfully!", text_color="#22c55e")
@@ -894,10 +1090,17 @@ class FaceApp(ctk.CTk):
             pin
         )
 
-        # Save image
-        user_dir = os.path.join("images/gallery", user_id)
-        os.makedirs(user_dir, exist_ok=True)
-        cv2.imwrite(os.path.join(user_dir, "register_img.jpg"), self.captured_frame)
+        user = db.get_user(user_id)
+        if user is not None:
+            self.gallery.add(user)
+            self.report_gallery_sync()
+            self.gallery.ensure_projection()
+
+        # Save image (content-addressed: identical photos are stored once)
+        data = self.captured_bytes
+        if data is None:
+            data = cv2.imencode(".jpg", self.captured_frame)[1].tobytes()
+        db.blobs.put(data, os.path.join("images/gallery", user_id, "register_img.jpg"))
 
         msg.showinfo("Success", f"✓ Registration Successful!\n\nUser ID: {user_id}\n\nYou can now login using your face.")
         self.build_home()
@@ -971,15 +1174,14 @@ class FaceApp(ctk.CTk):
         separator = ctk.CTkFrame(card, height=2, fg_color="#444444")
         separator.pack(fill="x", padx=100, pady=10)
 
-        self.camera_label = ctk.CTkLabel(
+        self.camera_view = VideoRenderer(
             card,
             text="Starting Camera...",
             width=640,
             height=480,
-            fg_color="#1a1a1a",
-            corner_radius=15
+            fg_color="#1a1a1a"
         )
-        self.camera_label.pack(padx=30, pady=20)
+        self.camera_view.pack(padx=30, pady=20)
 
         self.status_label = ctk.CTkLabel(
             card,
@@ -989,6 +1191,14 @@ class FaceApp(ctk.CTk):
         )
         self.status_label.pack(pady=10)
 
+        self.perf_label = ctk.CTkLabel(
+            card,
+            text="",
+            font=("Segoe UI", 10),
+            text_color="#666666"
+        )
+        self.perf_label.pack()
+
         self.btn_capture = ctk.CTkButton(
             card,
             text="Verify Face",
@@ -1026,60 +1236,233 @@ class FaceApp(ctk.CTk):
         if self.current_frame is None:
             msg.showerror("Error", "No camera frame available")
             return
-            
-        enc, status, _ = self.face.process(self.current_frame)
+
+        # Copy on capture: the preview buffer is reused for later frames
+        frame = self.current_frame.copy()
+        enc, status, faces = self.face.process(frame, scale=DEFAULT_SCALE)
         
         if status != "Face OK":
             msg.showerror("Error", f"Cannot verify: {status}")
             return
 
-        df = db.get_all_users()
-        if df.empty:
+        if len(self.gallery) == 0:
             msg.showerror("Denied", "No users registered")
             return
-            
-        known = [np.array(json.loads(e)) for e in df["face_encoding"]]
-        matches = face_recognition.compare_faces(known, enc, tolerance=0.45)
 
-        if True not in matches:
-            attempt_key = "unknown_face"
-            if attempt_key not in self.login_attempts:
-                self.login_attempts[attempt_key] = {"count": 0, "images": []}
-            
-            self.login_attempts[attempt_key]["count"] += 1
-            self.login_attempts[attempt_key]["images"].append(self.current_frame.copy())
-            
-            if self.login_attempts[attempt_key]["count"] >= 3:
-                today = datetime.now().strftime("%Y-%m-%d")
-                breach_dir = os.path.join("images/breach_logs", today)
-                os.makedirs(breach_dir, exist_ok=True)
-                
-                for idx, img in enumerate(self.login_attempts[attempt_key]["images"]):
-                    timestamp = datetime.now().strftime("%H%M%S")
-                    filename = f"unidentified_{timestamp}_{idx+1}.jpg"
-                    cv2.imwrite(os.path.join(breach_dir, filename), img)
-                
-                self.login_attempts[attempt_key] = {"count": 0, "images": []}
-                msg.showerror("Denied", "Face not recognized\nMaximum attempts reached. Logged to breach records.")
-            else:
-                msg.showerror("Denied", f"Face not recognized\nAttempt {self.login_attempts[attempt_key]['count']}/3")
+        result = self.gallery.identify(enc, k=3, tolerance=TOLERANCE)
+        user_id = result["user_id"]
+        if user_id is None and result.get("partial"):
+            # The face may be enrolled on a node that did not answer
+            msg.showerror("Error", "Some gallery nodes are unreachable\nPlease try again")
             return
+        if user_id is None:
+            self.record_failed_attempt("unknown_face", frame)
+            return
+
+        user = self.gallery.get(user_id)
+        if user is None:
+            msg.showerror("Error", "The gallery node holding this user is unreachable\nPlease try again")
+            return
+        self.complete_login(dict(user), frame, self.face_box(faces, DEFAULT_SCALE))
 
-        self.current_user = df.iloc[matches.index(True)].to_dict()
+    def record_failed_attempt(self, attempt_key, frame):
+        """Count a rejected face and log the images to breach records after 3 tries"""
+        if attempt_key not in self.login_attempts:
+            self.login_attempts[attempt_key] = {"count": 0, "images": []}
         
-        user_dir = os.path.join("images/gallery", self.current_user["user_id"])
-        os.makedirs(user_dir, exist_ok=True)
-        login_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        cv2.imwrite(os.path.join(user_dir, f"login_{login_timestamp}.jpg"), self.current_frame)
+        self.login_attempts[attempt_key]["count"] += 1
+        self.login_attempts[attempt_key]["images"].append(frame)
         
-        db.update_login_timestamp(self.current_user["user_id"])
+        if self.login_attempts[attempt_key]["count"] >= 3:
+            today = datetime.now().strftime("%Y-%m-%d")
+            breach_dir = os.path.join("images/breach_logs", today)
+            os.makedirs(breach_dir, exist_ok=True)
+            
+            for idx, img in enumerate(self.login_attempts[attempt_key]["images"]):
+                timestamp = datetime.now().strftime("%H%M%S")
+                filename = f"unidentified_{timestamp}_{idx+1}.jpg"
+                db.blobs.put(cv2.imencode(".jpg", img)[1].tobytes(), os.path.join(breach_dir, filename))
+            
+            self.login_attempts[attempt_key] = {"count": 0, "images": []}
+            msg.showerror("Denied", "Face not recognized\nMaximum attempts reached. Logged to breach records.")
+        else:
+            msg.showerror("Denied", f"Face not recognized\nAttempt {self.login_attempts[attempt_key]['count']}/3")
+
+    def face_box(self, faces, scale):
+        """First detected face scaled back to full-frame coordinates, or None
+        scale is the one process() ran with; self.face.scale may have been
+        changed since by the preview thread
+        """
+        if not faces:
+            return None
+        return tuple(int(v / scale) for v in faces[0])
+
+    def complete_login(self, user, frame, box=None):
+        """Store the login snapshot and continue to the PIN dialog or dashboard"""
+        self.current_user = user
+
+        try:
+            self.snapshots.append(self.current_user["user_id"], frame, box)
+        except Exception as e:
+            print(f"Snapshot error: {e}")
         
+        if db.update_login_timestamp(self.current_user["user_id"]):
+            self.sync_user_field(self.current_user["user_id"], "last_login")
+
         if self.current_user["user_type"] == "admin":
             self.show_pin_dialog()
         else:
             self.current_user_type = "general_user"
             self.show_dashboard()
 
+    # ================= VERIFY (1:1) =================
+    def show_verify(self):
+        """Show 1:1 verification screen (user ID + face)"""
+        self.clear_screen()
+        self.set_background()
+        self.image_captured = False
+
+        # Header
+        header = ctk.CTkFrame(self, fg_color="transparent", height=80)
+        header.pack(fill="x", padx=30, pady=20)
+
+        ctk.CTkLabel(
+            header,
+            text="IDENTITY FETCH .",
+            font=("Segoe UI", 28, "bold"),
+            text_color="#ffffff",
+            anchor="w"
+        ).pack(side="left")
+
+        # Main card
+        card = ctk.CTkFrame(
+            self,
+            fg_color="#1a1a1a",
+            border_width=2,
+            border_color="#333333",
+            corner_radius=25
+        )
+        card.place(relx=0.5, rely=0.5, anchor="center")
+
+        ctk.CTkLabel(
+            card,
+            text="Verify by User ID",
+            font=("Segoe UI", 32, "bold"),
+            text_color="#ffffff"
+        ).pack(pady=(30, 10))
+
+        # Separator
+        separator = ctk.CTkFrame(card, height=2, fg_color="#444444")
+        separator.pack(fill="x", padx=100, pady=10)
+
+        self.entry_verify_id = ctk.CTkEntry(
+            card,
+            placeholder_text="User ID (e.g. USR-1A2B3C)",
+            width=350,
+            height=45,
+            corner_radius=50,
+            fg_color="#2a2a2a",
+            border_width=2,
+            border_color="#333333",
+            font=("Segoe UI", 14),
+            justify="center"
+        )
+        self.entry_verify_id.pack(pady=10)
+        self.entry_verify_id.bind("<Return>", lambda e: self.capture_verify())
+
+        self.camera_view = VideoRenderer(
+            card,
+            text="Starting Camera...",
+            width=640,
+            height=480,
+            fg_color="#1a1a1a"
+        )
+        self.camera_view.pack(padx=30, pady=10)
+
+        self.status_label = ctk.CTkLabel(
+            card,
+            text="Initializing",
+            font=("Segoe UI", 16, "bold"),
+            text_color="#ffcc00"
+        )
+        self.status_label.pack(pady=5)
+
+        self.perf_label = ctk.CTkLabel(
+            card,
+            text="",
+            font=("Segoe UI", 10),
+            text_color="#666666"
+        )
+        self.perf_label.pack()
+
+        self.btn_capture = ctk.CTkButton(
+            card,
+            text="Verify",
+            state="disabled",
+            command=self.capture_verify,
+            fg_color="#3b7cb8",
+            hover_color="#2d5f8d",
+            text_color="#ffffff",
+            width=350,
+            height=55,
+            corner_radius=50,
+            font=("Segoe UI", 16, "bold")
+        )
+        self.btn_capture.pack(pady=10)
+
+        ctk.CTkButton(
+            card,
+            text="Back",
+            command=self.build_home,
+            fg_color="#2a2a2a",
+            hover_color="#3a3a3a",
+            border_width=2,
+            border_color="#555555",
+            text_color="#ffffff",
+            width=250,
+            height=45,
+            corner_radius=50,
+            font=("Segoe UI", 14)
+        ).pack(pady=(0, 20))
+
+        self.entry_verify_id.focus()
+        self.start_camera()
+
+    def capture_verify(self):
+        """Compare the live face against the template of the typed user ID only"""
+        user_id = self.entry_verify_id.get().strip().upper()
+        if not user_id:
+            msg.showerror("Error", "Please enter your User ID")
+            return
+        if self.current_frame is None:
+            msg.showerror("Error", "No camera frame available")
+            return
+
+        # Copy on capture: the preview buffer is reused for later frames
+        frame = self.current_frame.copy()
+        enc, status, faces = self.face.process(frame, scale=DEFAULT_SCALE)
+
+        if status != "Face OK":
+            msg.showerror("Error", f"Cannot verify: {status}")
+            return
+
+        try:
+            matched, _ = self.gallery.verify(user_id, enc)
+        except ConnectionError:
+            # An outage is not a wrong face: no failed attempt is counted
+            msg.showerror("Error", "The gallery node holding this user is unreachable\nPlease try again")
+            return
+        if not matched:
+            # Unknown IDs and wrong faces are reported the same way
+            self.record_failed_attempt(f"verify:{user_id}", frame)
+            return
+
+        user = self.gallery.get(user_id)
+        if user is None:
+            msg.showerror("Error", "The gallery node holding this user is unreachable\nPlease try again")
+            return
+        self.complete_login(dict(user), frame, self.face_box(faces, DEFAULT_SCALE))
+
     def show_pin_dialog(self):
         """Show PIN entry dialog for admin"""
         self.stop_camera()
@@ -1290,24 +1673,15 @@ class FaceApp(ctk.CTk):
         img_paths = db.get_user_images(user["user_id"])
         register_img = [p for p in img_paths if "register" in p]
         if register_img:
-            try:
-                img = Image.open(register_img[0])
-                img = img.resize((200, 200), Image.Resampling.LANCZOS)
-                
-                mask = Image.new('L', (200, 200), 0)
-                draw = ImageDraw.Draw(mask)
-                draw.ellipse((0, 0, 200, 200), fill=255)
-                
-                output = Image.new('RGBA', (200, 200), (0, 0, 0, 0))
-                output.paste(img, (0, 0))
-                output.putalpha(mask)
-                
-                photo = ctk.CTkImage(output, size=(200, 200))
-                img_label = ctk.CTkLabel(profile_frame, image=photo, text="")
-                img_label.image = photo
-                img_label.pack(pady=20)
-            except Exception as e:
-                print(f"Profile image error: {e}")
+            img_label = ctk.CTkLabel(profile_frame, text="Loading...", width=200, height=200, text_color="#888888")
+            img_label.pack(pady=20)
+
+            def show_photo(photo):
+                if photo is not None and img_label.winfo_exists():
+                    img_label.configure(image=photo, text="")
+
+            self.images.request(register_img[0], (200, 200), show_photo, transform=circular)
+            profile_frame.bind("<Destroy>", lambda e: self.images.cancel(), add="+")
 
         form_frame = ctk.CTkFrame(profile_frame, fg_color="transparent")
         form_frame.pack(pady=20, padx=50)
@@ -1382,6 +1756,8 @@ class FaceApp(ctk.CTk):
                         return
                     
                     db.update_user_field(user["user_id"], field_map[f], new_val)
+                    self.gallery.update_record(user["user_id"], {field_map[f]: new_val})
+                    self.report_gallery_sync()
                     self.current_user[field_map[f]] = new_val
                     msg.showinfo("Success", f"✓ {f} updated successfully!")
                 
@@ -1421,6 +1797,8 @@ class FaceApp(ctk.CTk):
         def delete_account():
             if msg.askyesno("Confirm", "Are you sure you want to delete your account?\nThis action cannot be undone."):
                 db.delete_user(user["user_id"])
+                self.gallery.remove(user["user_id"])
+                self.report_gallery_sync()
                 msg.showinfo("Success", "✓ Account deleted successfully!")
                 self.current_user = None
                 self.current_user_type = None
@@ -1527,6 +1905,8 @@ class FaceApp(ctk.CTk):
                 return
             
             db.update_admin_pin(user_id, new_pin)
+            self.gallery.update_record(user_id, {"admin_pin": new_pin})
+            self.report_gallery_sync()
             self.current_user["admin_pin"] = new_pin
             msg.showinfo("Success", "✓ Admin PIN updated successfully!")
             dialog.destroy()
@@ -1571,9 +1951,7 @@ class FaceApp(ctk.CTk):
             text_color="#ffffff"
         ).pack(side="left")
 
-        admins = db.get_users_by_type("admin")
-        
-        if admins.empty:
+        if db.count_users("admin") == 0:
             ctk.CTkLabel(
                 admin_frame,
                 text="No admins found",
@@ -1582,54 +1960,17 @@ class FaceApp(ctk.CTk):
             ).pack(pady=50)
             return
 
-        # Table Header
-        table_frame = ctk.CTkScrollableFrame(
+        # Only the visible rows get widgets; pages are fetched as they scroll into view
+        VirtualTable(
             admin_frame,
-            fg_color="transparent"
-        )
-        table_frame.pack(fill="both", expand=True, padx=20, pady=10)
-
-        # Column headers
-        headers = ["User ID", "Name", "Email", "Age", "Gender", "Phone", "Department"]
-        header_row = ctk.CTkFrame(table_frame, fg_color="#2a2a2a", corner_radius=10)
-        header_row.pack(fill="x", pady=5)
-        
-        for i, header in enumerate(headers):
-            ctk.CTkLabel(
-                header_row,
-                text=header,
-                font=("Segoe UI", 12, "bold"),
-                text_color="#ffffff",
-                width=130
-            ).grid(row=0, column=i, padx=5, pady=10)
-
-        # Data rows
-        for idx, admin in admins.iterrows():
-            row_frame = ctk.CTkFrame(
-                table_frame, 
-                fg_color="#1f1f1f" if idx % 2 == 0 else "#252525",
-                corner_radius=10
-            )
-            row_frame.pack(fill="x", pady=2)
-            
-            values = [
-                admin.get("user_id", ""),
-                admin.get("name", ""),
-                admin.get("email", ""),
-                admin.get("age", ""),
-                admin.get("gender", ""),
-                admin.get("phone", ""),
-                admin.get("dept", "")
-            ]
-            
-            for i, value in enumerate(values):
-                ctk.CTkLabel(
-                    row_frame,
-                    text=str(value)[:15] + "..." if len(str(value)) > 15 else str(value),
-                    font=("Segoe UI", 11),
-                    text_color="#cccccc",
-                    width=130
-                ).grid(row=0, column=i, padx=5, pady=8)
+            columns=[("User ID", "user_id"), ("Name", "name"), ("Email", "email"), ("Age", "age"),
+                     ("Gender", "gender"), ("Phone", "phone"), ("Department", "dept")],
+            fetch_page=lambda offset, limit: db.get_users_page("admin", offset, limit),
+            count=lambda: db.count_users("admin"),
+            column_width=130,
+            max_chars=15,
+            font_size=11
+        ).pack(fill="both", expand=True, padx=20, pady=10)
 
     def show_user_details(self):
         """Show all users (EDITABLE with Delete)"""
@@ -1668,9 +2009,7 @@ class FaceApp(ctk.CTk):
             corner_radius=50
         ).pack(side="right")
 
-        users = db.get_users_by_type("general_user")
-        
-        if users.empty:
+        if db.count_users("general_user") == 0:
             ctk.CTkLabel(
                 user_frame,
                 text="No users found",
@@ -1679,84 +2018,66 @@ class FaceApp(ctk.CTk):
             ).pack(pady=50)
             return
 
-        # Table
-        table_frame = ctk.CTkScrollableFrame(
+        # Search box: filters as the admin types
+        search_entry = ctk.CTkEntry(
             user_frame,
-            fg_color="transparent"
+            placeholder_text="🔍 Search name, email, phone or department",
+            height=40,
+            corner_radius=50,
+            fg_color="#2a2a2a",
+            border_width=2,
+            border_color="#333333",
+            font=("Segoe UI", 13)
         )
-        table_frame.pack(fill="both", expand=True, padx=20, pady=10)
-
-        # Column headers
-        headers = ["User ID", "Name", "Email", "Age", "Gender", "Phone", "Dept", "Actions"]
-        header_row = ctk.CTkFrame(table_frame, fg_color="#2a2a2a", corner_radius=10)
-        header_row.pack(fill="x", pady=5)
-        
-        for i, header in enumerate(headers):
-            ctk.CTkLabel(
-                header_row,
-                text=header,
-                font=("Segoe UI", 11, "bold"),
-                text_color="#ffffff",
-                width=110
-            ).grid(row=0, column=i, padx=3, pady=10)
-
-        # Data rows
-        for idx, user in users.iterrows():
-            row_frame = ctk.CTkFrame(
-                table_frame, 
-                fg_color="#1f1f1f" if idx % 2 == 0 else "#252525",
-                corner_radius=10
-            )
-            row_frame.pack(fill="x", pady=2)
-            
-            user_id = user.get("user_id", "")
-            
-            values = [
-                user_id,
-                user.get("name", ""),
-                user.get("email", ""),
-                user.get("age", ""),
-                user.get("gender", ""),
-                user.get("phone", ""),
-                user.get("dept", "")
+        search_entry.pack(fill="x", padx=30, pady=(0, 5))
+        search_status = ctk.CTkLabel(user_frame, text="", font=("Segoe UI", 12), text_color="#888888")
+        search_status.pack(anchor="w", padx=40)
+        self.start_search_index()
+
+        # Only the visible rows get widgets; pages are fetched as they scroll into view
+        all_users = (
+            lambda offset, limit: db.get_users_page("general_user", offset, limit),
+            lambda: db.count_users("general_user")
+        )
+        table = VirtualTable(
+            user_frame,
+            columns=[("User ID", "user_id"), ("Name", "name"), ("Email", "email"), ("Age", "age"),
+                     ("Gender", "gender"), ("Phone", "phone"), ("Dept", "dept")],
+            fetch_page=all_users[0],
+            count=all_users[1],
+            actions=[
+                ("✏️", "#1f2d3d", "#2f3d4d", self.edit_user_dialog),
+                ("🗑️", "#3d1a1a", "#4d2a2a", lambda user: self.delete_user_confirm(user["user_id"]))
             ]
-            
-            for i, value in enumerate(values):
-                ctk.CTkLabel(
-                    row_frame,
-                    text=str(value)[:12] + ".." if len(str(value)) > 12 else str(value),
-                    font=("Segoe UI", 10),
-                    text_color="#cccccc",
-                    width=110
-                ).grid(row=0, column=i, padx=3, pady=8)
-            
-            # Action buttons
-            action_frame = ctk.CTkFrame(row_frame, fg_color="transparent")
-            action_frame.grid(row=0, column=len(values), padx=3, pady=5)
-            
-            # Edit button
-            ctk.CTkButton(
-                action_frame,
-                text="✏️",
-                command=lambda u=user.to_dict(): self.edit_user_dialog(u),
-                fg_color="#1f2d3d",
-                hover_color="#2f3d4d",
-                width=35,
-                height=30,
-                corner_radius=5
-            ).pack(side="left", padx=2)
-            
-            # Delete button
-            ctk.CTkButton(
-                action_frame,
-                text="🗑️",
-                command=lambda uid=user_id: self.delete_user_confirm(uid),
-                fg_color="#3d1a1a",
-                hover_color="#4d2a2a",
-                width=35,
-                height=30,
-                corner_radius=5
-            ).pack(side="left", padx=2)
+        )
+        table.pack(fill="both", expand=True, padx=20, pady=10)
+
+        def run_search():
+            self.search_job = None
+            if not search_entry.winfo_exists():
+                return
+            query = search_entry.get().strip()
+            if not query:
+                search_status.configure(text="")
+                table.set_source(*all_users)
+                return
+            if self.user_search is None:
+                # Still being built (or restarted after a failed build): ask again shortly
+                self.start_search_index()
+                search_status.configure(text="Indexing users…")
+                self.search_job = self.after(200, run_search)
+                return
+            search_status.configure(text="")
+            results = self.user_search.search(query, user_type="general_user")
+            table.set_source(lambda offset, limit: results[offset:offset + limit], lambda: len(results))
+
+        def on_key(_event):
+            # Debounce: search once typing pauses
+            if self.search_job is not None:
+                self.after_cancel(self.search_job)
+            self.search_job = self.after(150, run_search)
+
+        search_entry.bind("<KeyRelease>", on_key)
 
     def edit_user_dialog(self, user):
         """Dialog to edit user details"""
@@ -1835,6 +2156,14 @@ class FaceApp(ctk.CTk):
                 phone_entry.get(),
                 dept_entry.get()
             )
+            self.gallery.update_record(user["user_id"], {
+                "name": name_entry.get(),
+                "email": email_entry.get(),
+                "age": age_entry.get(),
+                "phone": phone_entry.get(),
+                "dept": dept_entry.get()
+            })
+            self.report_gallery_sync()
             msg.showinfo("Success", "✓ User updated successfully!")
             dialog.destroy()
             self.show_user_details()
@@ -1857,11 +2186,13 @@ class FaceApp(ctk.CTk):
         """Confirm and delete user"""
         if msg.askyesno("Confirm Delete", f"Are you sure you want to delete user {user_id}?\nThis action cannot be undone."):
             db.delete_user(user_id)
+            self.gallery.remove(user_id)
+            self.report_gallery_sync()
             msg.showinfo("Success", "✓ User deleted successfully!")
             self.show_user_details()
 
-    def show_breach_logs(self):
-        """Show breach logs"""
+    def show_breach_logs(self, range_days=BREACH_RETENTION_DAYS):
+        """Show breach logs, newest day first, loading older days on scroll"""
         for w in self.content_area.winfo_children():
             w.destroy()
 
@@ -1874,16 +2205,34 @@ class FaceApp(ctk.CTk):
         )
         breach_frame.pack(fill="both", expand=True)
 
+        header_frame = ctk.CTkFrame(breach_frame, fg_color="transparent")
+        header_frame.pack(fill="x", padx=30, pady=20)
+
         ctk.CTkLabel(
-            breach_frame,
+            header_frame,
             text="⚠️ Breach Logs",
             font=("Segoe UI", 28, "bold"),
             text_color="#ffffff"
-        ).pack(pady=30)
+        ).pack(side="left")
 
-        breach_base = "images/breach_logs"
-        
-        if not os.path.exists(breach_base) or not os.listdir(breach_base):
+        ranges = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90}
+        range_menu = ctk.CTkOptionMenu(
+            header_frame,
+            values=list(ranges),
+            command=lambda choice: self.show_breach_logs(ranges[choice]),
+            fg_color="#2a2a2a",
+            button_color="#3a3a3a",
+            width=150
+        )
+        range_menu.set(next((k for k, v in ranges.items() if v == range_days), f"Last {range_days} days"))
+        range_menu.pack(side="right")
+
+        today = datetime.now().date()
+        # range_days days including today
+        days = self.breach_archive.days(today - timedelta(days=range_days - 1), today)
+        first_day = next(days, None)
+
+        if first_day is None:
             ctk.CTkLabel(
                 breach_frame,
                 text="No breach logs found",
@@ -1899,62 +2248,120 @@ class FaceApp(ctk.CTk):
         )
         logs_frame.pack(fill="both", expand=True, padx=20, pady=10)
 
-        # List all date folders
-        date_folders = sorted(os.listdir(breach_base), reverse=True)
-        
-        for date_folder in date_folders:
-            folder_path = os.path.join(breach_base, date_folder)
-            if not os.path.isdir(folder_path):
-                continue
-            
-            # Date header
-            date_header = ctk.CTkFrame(logs_frame, fg_color="#2a2a2a", corner_radius=10)
-            date_header.pack(fill="x", pady=10)
-            
-            ctk.CTkLabel(
-                date_header,
-                text=f"📅 {date_folder}",
-                font=("Segoe UI", 16, "bold"),
-                text_color="#ffffff"
-            ).pack(side="left", padx=20, pady=10)
-            
-            # Count images
-            images = [f for f in os.listdir(folder_path) if f.endswith(('.jpg', '.jpeg', '.png'))]
-            ctk.CTkLabel(
-                date_header,
-                text=f"{len(images)} attempts",
-                font=("Segoe UI", 12),
-                text_color="#ff6b6b"
-            ).pack(side="right", padx=20, pady=10)
-            
-            # Show images in grid
-            img_frame = ctk.CTkFrame(logs_frame, fg_color="transparent")
-            img_frame.pack(fill="x", pady=5)
-            
-            for i, img_file in enumerate(images[:6]):  # Show max 6 per date
-                try:
-                    img_path = os.path.join(folder_path, img_file)
-                    img = Image.open(img_path)
-                    img = img.resize((150, 120), Image.Resampling.LANCZOS)
-                    photo = ctk.CTkImage(img, size=(150, 120))
-                    
-                    img_label = ctk.CTkLabel(
-                        img_frame, 
-                        image=photo, 
-                        text="",
-                        fg_color="#1f1f1f",
-                        corner_radius=10
-                    )
-                    img_label.image = photo
-                    img_label.grid(row=i//3, column=i%3, padx=10, pady=5)
-                except Exception as e:
-                    print(f"Error loading breach image: {e}")
+        loading = ctk.CTkLabel(logs_frame, text="", font=("Segoe UI", 12), text_color="#888888")
+        pending_days = [first_day]
+
+        def add_days(n):
+            """Append the next n days that have breach folders"""
+            loading.pack_forget()
+            for _ in range(n):
+                day = pending_days.pop() if pending_days else next(days, None)
+                if day is None:
+                    return False
+                self.build_breach_day(logs_frame, day)
+            loading.configure(text="Scroll for older days...")
+            loading.pack(pady=15)
+            return True
+
+        # The list's canvas reports every view change (scrolling, resizing, new
+        # days added) through yscrollcommand; older days are fetched once its
+        # bottom edge comes into view
+        canvas = logs_frame.nametowidget(logs_frame.winfo_parent())
+        scrollbar_set = str(canvas.cget("yscrollcommand"))
+        state = {"more": True, "queued": False}
+
+        def load_more():
+            state["queued"] = False
+            if state["more"] and logs_frame.winfo_exists():
+                state["more"] = add_days(BREACH_DAYS_PER_BATCH)
+
+        def on_view_change(first, last):
+            self.tk.eval(f"{scrollbar_set} {first} {last}")
+            if state["more"] and not state["queued"] and float(last) >= 0.98:
+                state["queued"] = True
+                self.after_idle(load_more)
+
+        canvas.configure(yscrollcommand=on_view_change)
+        state["more"] = add_days(BREACH_DAYS_PER_BATCH)
+
+        # Leaving the view drops any loads still queued
+        breach_frame.bind("<Destroy>", lambda e: self.images.cancel(), add="+")
+
+    def build_breach_day(self, parent, day, per_page=6):
+        """One day of breach images with its own page controls"""
+        total = self.breach_archive.count(day)
+        pages = max(1, -(-total // per_page))
+
+        date_header = ctk.CTkFrame(parent, fg_color="#2a2a2a", corner_radius=10)
+        date_header.pack(fill="x", pady=10)
+
+        ctk.CTkLabel(
+            date_header,
+            text=f"📅 {day:%Y-%m-%d}",
+            font=("Segoe UI", 16, "bold"),
+            text_color="#ffffff"
+        ).pack(side="left", padx=20, pady=10)
+
+        ctk.CTkLabel(
+            date_header,
+            text=f"{total} attempts",
+            font=("Segoe UI", 12),
+            text_color="#ff6b6b"
+        ).pack(side="right", padx=20, pady=10)
+
+        img_frame = ctk.CTkFrame(parent, fg_color="transparent")
+        img_frame.pack(fill="x", pady=5)
+        state = {"page": 0}
+
+        def show_page(page):
+            state["page"] = max(0, min(page, pages - 1))
+            for w in img_frame.winfo_children():
+                w.destroy()
+
+            for i, img_path in enumerate(self.breach_archive.page(day, state["page"], per_page)):
+                # Placeholder now, picture once the loader has decoded it
+                img_label = ctk.CTkLabel(
+                    img_frame,
+                    text="⏳",
+                    width=150,
+                    height=120,
+                    fg_color="#1f1f1f",
+                    corner_radius=10
+                )
+                img_label.grid(row=i//3, column=i%3, padx=10, pady=5)
+
+                def show_photo(photo, label=img_label):
+                    if photo is not None and label.winfo_exists():
+                        label.configure(image=photo, text="")
+
+                self.images.request(img_path, (150, 120), show_photo)
+
+            if pages > 1:
+                nav = ctk.CTkFrame(img_frame, fg_color="transparent")
+                nav.grid(row=2, column=0, columnspan=3, pady=5)
+                ctk.CTkButton(
+                    nav, text="◀", width=40, height=28, corner_radius=5,
+                    fg_color="#2a2a2a", hover_color="#3a3a3a",
+                    command=lambda: show_page(state["page"] - 1)
+                ).pack(side="left", padx=5)
+                ctk.CTkLabel(
+                    nav, text=f"Page {state['page'] + 1} / {pages}",
+                    font=("Segoe UI", 11), text_color="#cccccc"
+                ).pack(side="left", padx=10)
+                ctk.CTkButton(
+                    nav, text="▶", width=40, height=28, corner_radius=5,
+                    fg_color="#2a2a2a", hover_color="#3a3a3a",
+                    command=lambda: show_page(state["page"] + 1)
+                ).pack(side="left", padx=5)
+
+        show_page(0)
 
     def logout(self):
         """Logout user"""
         if msg.askyesno("Logout", "Are you sure you want to logout?"):
             if self.current_user:
-                db.update_logout_timestamp(self.current_user["user_id"])
+                if db.update_logout_timestamp(self.current_user["user_id"]):
+                    self.sync_user_field(self.current_user["user_id"], "last_logout")
             msg.showinfo("Success", "✓ Logged out successfully!")
             self.current_user = None
             self.current_user_type = None
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import shutil
+import time
+
+BLOB_DIR = "images/.blobs"
+GC_GRACE_SECONDS = 60         # younger blobs may be about to get their first link
+
+
+class BlobStore:
+    """Content-addressed image storage with hard-link reference counting.
+
+    Each distinct image is stored once as .blobs/<aa>/<sha256>; the paths the
+    app uses (images/gallery/<uid>/register_img.jpg, breach images, ...) are
+    hard links to it. The link count is the reference count: a blob whose
+    only remaining link is itself is garbage. Where hard links are not
+    supported the file is copied instead (no deduplication, still correct).
+    """
+
+    def __init__(self, base=BLOB_DIR):
+        self.base = base
+
+    def blob_path(self, digest):
+        return os.path.join(self.base, digest[:2], digest)
+
+    def _store(self, blob, data):
+        """Make sure the blob exists and looks fresh, so gc() leaves it alone while it gets linked"""
+        try:
+            os.utime(blob)
+            return
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        tmp = f"{blob}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, blob)
+
+    def put(self, data, dest):
+        """Store bytes at dest, sharing the blob with identical content
+        Returns: the content hash
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self.blob_path(digest)
+        self._store(blob, data)
+
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        if os.path.lexists(dest):
+            try:
+                if os.path.samefile(dest, blob):
+                    return digest
+            except FileNotFoundError:
+                pass
+            self.release(dest)
+        for attempt in range(3):
+            try:
+                os.link(blob, dest)
+                return digest
+            except FileNotFoundError:
+                # A concurrent release() removed the blob before the link: write it again
+                if attempt == 2:
+                    raise
+                self._store(blob, data)
+            except OSError:
+                # No hard links here: a plain copy of the bytes (no deduplication)
+                with open(dest, "wb") as f:
+                    f.write(data)
+                return digest
+
+    def release(self, path):
+        """Remove one reference; the blob goes too once nothing links to it"""
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            return False
+        blob = None
+        if st.st_nlink > 1:
+            with open(path, "rb") as f:
+                blob = self.blob_path(hashlib.sha256(f.read()).hexdigest())
+        os.remove(path)
+        if blob is not None:
+            try:
+                if os.stat(blob).st_nlink == 1:
+                    os.remove(blob)
+            except FileNotFoundError:
+                pass
+        return True
+
+    def release_tree(self, folder):
+        """Release every file under folder, then remove the folder"""
+        if not os.path.isdir(folder):
+            return
+        for root, _, names in os.walk(folder):
+            for name in names:
+                self.release(os.path.join(root, name))
+        shutil.rmtree(folder, ignore_errors=True)
+
+    def gc(self):
+        """Delete blobs nothing links to (e.g. after folders were removed directly)
+        Returns: (files, bytes) freed
+        """
+        files = size = 0
+        grace = time.time() - GC_GRACE_SECONDS
+        try:
+            shards = list(os.scandir(self.base))
+        except FileNotFoundError:
+            return 0, 0
+        for shard in shards:
+            if not shard.is_dir():
+                continue
+            with os.scandir(shard.path) as entries:
+                for entry in entries:
+                    # os.stat, not entry.stat(): only it reports st_nlink on Windows
+                    st = os.stat(entry.path)
+                    if st.st_nlink == 1 and st.st_mtime < grace:
+                        try:
+                            os.remove(entry.path)
+                            files += 1
+                            size += st.st_size
+                        except OSError:
+                            pass
+        return files, size
+
+    def stats(self):
+        """Unique blobs, their bytes, and the bytes saved by sharing them"""
+        blobs = stored = saved = 0
+        for root, _, names in os.walk(self.base):
+            for name in names:
+                st = os.stat(os.path.join(root, name))
+                blobs += 1
+                stored += st.st_size
+                saved += st.st_size * max(0, st.st_nlink - 2)
+        return {"blobs": blobs, "bytes": stored, "bytes_saved": saved}
@@ -0,0 +1,64 @@
+import os
+from datetime import date, timedelta
+
+BREACH_DIR = "images/breach_logs"
+BREACH_RETENTION_DAYS = 30
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+class BreachArchive:
+    """Date-indexed access to images/breach_logs/<YYYY-MM-DD>/.
+
+    Days are found by walking the calendar over the requested range and
+    checking for each day's folder, so the archive root is never listed.
+    Only the folders of days actually shown are scanned, and each scan is
+    reused until that folder's mtime changes.
+    """
+
+    def __init__(self, base=BREACH_DIR):
+        self.base = base
+        self._listings = {}     # day -> (folder mtime_ns, sorted file names)
+
+    def folder(self, day):
+        return os.path.join(self.base, day.strftime("%Y-%m-%d"))
+
+    def days(self, start=None, end=None):
+        """Days with a breach folder between start and end (inclusive), newest first"""
+        end = end or date.today()
+        start = start or end - timedelta(days=BREACH_RETENTION_DAYS - 1)
+        day = end
+        while day >= start:
+            if os.path.isdir(self.folder(day)):
+                yield day
+            day -= timedelta(days=1)
+
+    def _files(self, day):
+        path = self.folder(day)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self._listings.pop(day, None)
+            return []
+        cached = self._listings.get(day)
+        if cached is None or cached[0] != mtime:
+            with os.scandir(path) as entries:
+                names = sorted(
+                    (e.name for e in entries if e.name.lower().endswith(IMAGE_EXTENSIONS)),
+                    reverse=True
+                )
+            cached = (mtime, names)
+            self._listings[day] = cached
+        return cached[1]
+
+    def count(self, day):
+        """Number of breach images stored for one day"""
+        return len(self._files(day))
+
+    def count_range(self, start=None, end=None):
+        return sum(self.count(day) for day in self.days(start, end))
+
+    def page(self, day, page=0, per_page=6):
+        """Image paths for one page of a day, newest first"""
+        names = self._files(day)[page * per_page:(page + 1) * per_page]
+        folder = self.folder(day)
+        return [os.path.join(folder, name) for name in names]
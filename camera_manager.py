@@ -0,0 +1,217 @@
+import cv2
+import threading
+import time
+
+CAMERA_INDEX = 0
+
+# Requested capture settings; the driver may grant something else
+FRAME_WIDTH = 640
+FRAME_HEIGHT = 480
+FRAME_FPS = 30
+FOURCC = "MJPG"
+BUFFER_SIZE = 1
+
+# Grab continuously and only decode the frame a screen actually asks for
+LATEST_FRAME_ONLY = True
+
+
+class CameraManager:
+    """Keeps the camera device open for the lifetime of the app.
+
+    A background thread grabs frames while at least one screen has asked for
+    video and idles (without releasing the device) when nobody needs it.
+    Screens read the most recent frame with read().
+
+    Frames are decoded into a fixed set of reused buffers. The array returned
+    by read() stays untouched until the next read(); callers that need to
+    keep a frame longer must copy it.
+    """
+
+    def __init__(self, index=CAMERA_INDEX, width=FRAME_WIDTH, height=FRAME_HEIGHT,
+                 fps=FRAME_FPS, fourcc=FOURCC, buffer_size=BUFFER_SIZE,
+                 latest_only=LATEST_FRAME_ONLY):
+        self.index = index
+        self.cap = None
+        self.requested = {
+            "width": width,
+            "height": height,
+            "fps": fps,
+            "fourcc": fourcc,
+            "buffer_size": buffer_size
+        }
+        self.granted = {}
+        self.latest_only = latest_only
+
+        self._lock = threading.Lock()
+        self._wanted = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+        # Triple buffer: the thread fills _back and publishes it as _ready;
+        # read() swaps _ready to the front (_frame). The lock only guards
+        # these swaps, never the blocking grab/retrieve calls.
+        self._frame = None
+        self._back = None
+        self._ready = None
+        self._frame_id = 0
+        self._has_frame = False
+        self._ready_id = 0
+        self._ready_time = 0.0
+        # Set by read() in latest-only mode: decode the next grabbed frame
+        self._retrieve_wanted = threading.Event()
+
+        # capture-to-display latency (exponential moving average, seconds)
+        self._captured_at = {}
+        self.latency = None
+
+    # =========================
+    # DEVICE
+    # =========================
+    def open(self):
+        """Open the device once; later calls reuse it"""
+        if self.cap is not None and self.cap.isOpened():
+            return True
+
+        self.cap = cv2.VideoCapture(self.index)
+        if not self.cap.isOpened():
+            self.cap = None
+            return False
+        self.granted = self.configure()
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._grab_loop, daemon=True)
+        self._thread.start()
+        return True
+
+    def close(self):
+        """Release the device (only on app shutdown)"""
+        self._stopped.set()
+        self._wanted.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        with self._lock:
+            self._frame = self._back = self._ready = None
+
+    def configure(self):
+        """Apply the requested settings and return what the driver granted"""
+        req = self.requested
+        cap = self.cap
+
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, req["buffer_size"])
+        if req["fourcc"]:
+            cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*req["fourcc"]))
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, req["width"])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, req["height"])
+        cap.set(cv2.CAP_PROP_FPS, req["fps"])
+
+        code = int(cap.get(cv2.CAP_PROP_FOURCC))
+        granted = {
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": cap.get(cv2.CAP_PROP_FPS),
+            "fourcc": "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)) if code else "",
+            "buffer_size": int(cap.get(cv2.CAP_PROP_BUFFERSIZE))
+        }
+
+        for key, wanted in req.items():
+            if wanted and granted[key] != wanted:
+                print(f"Camera: requested {key}={wanted}, driver granted {granted[key]}")
+        return granted
+
+    def is_opened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    # =========================
+    # STREAM CONTROL
+    # =========================
+    def resume(self):
+        """Start handing frames to the active screen"""
+        if not self.open():
+            return False
+        self._wanted.set()
+        return True
+
+    def pause(self):
+        """Stop grabbing frames but keep the device open"""
+        self._wanted.clear()
+        self._retrieve_wanted.clear()
+        with self._lock:
+            self._frame_id = self._ready_id
+            self._has_frame = False
+
+    @property
+    def active(self):
+        return self._wanted.is_set() and self.is_opened()
+
+    def read(self):
+        """Return (frame_id, frame) of the freshest available frame
+
+        In latest-only mode this also asks the grab thread to decode the next
+        frame it grabs, so frames nobody reads are never decoded.
+        """
+        if self.latest_only and self._wanted.is_set():
+            self._retrieve_wanted.set()
+        with self._lock:
+            if self._ready_id == self._frame_id or not self._wanted.is_set():
+                return self._frame_id, self._frame if self._has_frame else None
+
+            self._ready, self._frame = self._frame, self._ready
+            self._frame_id = self._ready_id
+            self._has_frame = True
+            self._remember(self._frame_id, self._ready_time)
+            return self._frame_id, self._frame
+
+    def mark_displayed(self, frame_id):
+        """Record that frame_id reached the screen to measure latency"""
+        captured = self._captured_at.pop(frame_id, None)
+        if captured is None:
+            return
+        sample = time.perf_counter() - captured
+        self.latency = sample if self.latency is None else 0.9 * self.latency + 0.1 * sample
+
+    def stats(self):
+        """Negotiated settings and measured capture-to-display latency (ms)"""
+        return {
+            "requested": dict(self.requested),
+            "granted": dict(self.granted),
+            "latest_only": self.latest_only,
+            "latency_ms": None if self.latency is None else round(self.latency * 1000, 1)
+        }
+
+    def _remember(self, frame_id, stamp):
+        self._captured_at[frame_id] = stamp
+        if len(self._captured_at) > 8:
+            self._captured_at.pop(next(iter(self._captured_at)))
+
+    def _grab_loop(self):
+        while not self._stopped.is_set():
+            if not self._wanted.wait(timeout=0.5):
+                continue
+            if self._stopped.is_set():
+                break
+
+            if self.latest_only:
+                if not self.cap.grab():
+                    time.sleep(0.01)
+                    continue
+                stamp = time.perf_counter()
+                if not self._retrieve_wanted.is_set():
+                    continue
+                self._retrieve_wanted.clear()
+                ret, frame = self.cap.retrieve(self._back)
+            else:
+                ret, frame = self.cap.read(self._back)
+                stamp = time.perf_counter()
+            if not ret:
+                time.sleep(0.01)
+                continue
+
+            with self._lock:
+                self._back, self._ready = self._ready, frame
+                if self._wanted.is_set():
+                    self._ready_id += 1
+                    self._ready_time = stamp
@@ -0,0 +1,109 @@
+import json
+import os
+import socket
+import time
+import uuid
+
+from file_lock import file_lock
+
+CHANGE_LOG_FILE = "database.changes.jsonl"
+
+# Written into every event, so a process can tell its own changes from others'
+ORIGIN = f"{socket.gethostname()}/{os.getpid()}/{uuid.uuid4().hex[:8]}"
+
+
+class ChangeLog:
+    """Append-only log of user changes (register, update, delete).
+
+    One JSON event per line with an increasing seq number. Readers keep
+    the byte offset they stopped at, so catching up only reads new events.
+    Several processes may share the log: assigning a seq and appending the
+    line happen under a lock on <log>.lock, so seq numbers never repeat.
+    """
+
+    def __init__(self, path=CHANGE_LOG_FILE):
+        self.path = path
+        self.seq = self.last_seq()
+        self._size = self.size()
+        # Called with each event appended by this process
+        self.listeners = []
+
+    def locked(self):
+        """Exclusive lock shared by every process appending to this log"""
+        return file_lock(self.path + ".lock")
+
+    def position(self):
+        """(last seq, byte size) of the log, read together"""
+        with self.locked():
+            return self.last_seq(), self.size()
+
+    def last_seq(self):
+        """Sequence number of the last complete event already in the file"""
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - 65536))
+            lines = f.read().splitlines()
+        for line in reversed(lines):
+            try:
+                return int(json.loads(line)["seq"])
+            except (ValueError, KeyError):
+                continue
+        return 0
+
+    def append(self, op, user_id, data=None):
+        """Write one event and return its seq"""
+        event = {"seq": None, "ts": time.time(), "origin": ORIGIN, "op": op, "user_id": user_id, "data": data}
+        try:
+            with self.locked():
+                if self.size() != self._size:
+                    # Another process sharing the database appended since our last write
+                    self.seq = self.last_seq()
+                self.seq += 1
+                event["seq"] = self.seq
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(event, default=str) + "\n")
+                self._size = self.size()
+        except Exception as e:
+            print(f"Change log error: {e}")
+        for listener in self.listeners:
+            listener(event)
+        return self.seq
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def read_from(self, offset):
+        """Events written after a byte offset
+        Returns: (events, new offset); a partly written last line is left for later
+        """
+        if not os.path.exists(self.path):
+            return [], offset
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            chunk = f.read()
+
+        end = chunk.rfind(b"\n") + 1
+        events = []
+        for line in chunk[:end].splitlines():
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                print(f"Change log error: skipped unreadable event at offset {offset}")
+        return events, offset + end
+
+
+def apply_event(index, event):
+    """Apply one change event to an EncodingIndex (idempotent)"""
+    op, user_id = event["op"], event["user_id"]
+    if op == "register":
+        index.add(event["data"])
+    elif op == "update":
+        index.update_record(user_id, event["data"])
+    elif op == "delete":
+        index.remove(user_id)
@@ -1,10 +1,21 @@
 import pandas as pd
 import os
+import threading
 from datetime import datetime
+from functools import wraps
+
+from blob_store import BlobStore
+from change_log import ChangeLog
 
 DB_FILE = "database.xlsx"
 IMG_DIR = "images/gallery"
 
+# Register/update/delete events for replicas and other app instances
+changes = ChangeLog()
+
+# Deduplicated image files; user folders hold hard links into it
+blobs = BlobStore()
+
 
 # =========================
 # INIT
@@ -53,35 +64,96 @@ def init_database():
 # =========================
 # DB HELPERS
 # =========================
-def load_db():
-    """Load both admin and user sheets and combine them"""
+# Parsed workbook plus user_id -> row, reused until the file changes on disk
+_cache = {"stamp": None, "df": None, "row_of": {}, "rows_by_type": {}}
+_lock = threading.RLock()
+
+
+def _serialized(func):
+    """Run a CRUD function under the cache lock (the watcher thread reads too)"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        with _lock:
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def _stamp():
+    try:
+        st = os.stat(DB_FILE)
+        return st.st_mtime_ns, st.st_size
+    except OSError:
+        return None
+
+
+def _read_db():
     try:
         admins = pd.read_excel(DB_FILE, sheet_name="admins")
         users = pd.read_excel(DB_FILE, sheet_name="users")
         return pd.concat([admins, users], ignore_index=True)
     except:
         init_database()
-        return load_db()
+        return _read_db()
 
 
+def _remember(df):
+    """Make df the cached table and rebuild the user_id index"""
+    df = df.reset_index(drop=True)
+    _cache["df"] = df
+    _cache["stamp"] = _stamp()
+    _cache["row_of"] = {uid: row for row, uid in enumerate(df["user_id"])}
+    rows_by_type = {}
+    for row, user_type in enumerate(df["user_type"]):
+        rows_by_type.setdefault(user_type, []).append(row)
+    _cache["rows_by_type"] = rows_by_type
+    return df
+
+
+def _table():
+    """Cached table, re-read only when the workbook changed on disk"""
+    if _cache["df"] is None or _stamp() != _cache["stamp"]:
+        _remember(_read_db())
+    return _cache["df"]
+
+
+def _row(uid):
+    """Row of a user in the cached table, or None"""
+    return _cache["row_of"].get(uid)
+
+
+@_serialized
+def load_db():
+    """Load both admin and user sheets and combine them"""
+    return _table().copy()
+
+
+@_serialized
 def save_db(df):
     """Save dataframe back to appropriate sheets"""
     admins = df[df["user_type"] == "admin"]
     users = df[df["user_type"] == "general_user"]
-    
-    with pd.ExcelWriter(DB_FILE, engine="openpyxl", mode="w") as writer:
-        admins.to_excel(writer, sheet_name="admins", index=False)
-        users.to_excel(writer, sheet_name="users", index=False)
+
+    try:
+        with pd.ExcelWriter(DB_FILE, engine="openpyxl", mode="w") as writer:
+            admins.to_excel(writer, sheet_name="admins", index=False)
+            users.to_excel(writer, sheet_name="users", index=False)
+    except Exception:
+        # The cached frame may hold edits that never reached the disk
+        _cache["df"] = None
+        raise
+    # Cache the rows in file order (admins first), as a reload would return them
+    _remember(pd.concat([admins, users], ignore_index=True))
 
 
 # =========================
 # USER CRUD
 # =========================
+@_serialized
 def register_user(user_id, name, email, age, gender, phone, dept, encoding, user_type="general_user", admin_pin=None):
     """Register a new user with predefined user_id"""
-    df = load_db()
+    df = _table()
 
-    df = pd.concat([df, pd.DataFrame([{
+    record = {
         "user_id": user_id,
         "name": name,
         "email": email,
@@ -95,9 +167,11 @@ def register_user(user_id, name, email, age, gender, phone, dept, encoding, user
         "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "last_login": "Never",
         "last_logout": "Never"
-    }])], ignore_index=True)
+    }
+    df = pd.concat([df, pd.DataFrame([record])], ignore_index=True)
 
     save_db(df)
+    changes.append("register", user_id, record)
     return user_id
 
 
@@ -106,82 +180,108 @@ def get_all_users():
     return load_db()
 
 
+@_serialized
+def get_user(uid):
+    """Get a single user record as a dict, or None"""
+    df = _table()
+    row = _row(uid)
+    if row is None:
+        return None
+    return df.loc[row].to_dict()
+
+
+@_serialized
 def get_users_by_type(user_type):
     """Get users by type (admin or general_user)"""
-    df = load_db()
-    return df[df["user_type"] == user_type]
+    df = _table()
+    return df[df["user_type"] == user_type].copy()
+
+
+@_serialized
+def count_users(user_type):
+    """Number of users of a type, without copying the table"""
+    _table()
+    return len(_cache["rows_by_type"].get(user_type, []))
+
+
+@_serialized
+def get_users_page(user_type, offset, limit):
+    """One page of users of a type as a list of dicts, in table order"""
+    df = _table()
+    rows = _cache["rows_by_type"].get(user_type, [])[offset:offset + limit]
+    return df.iloc[rows].to_dict("records")
+
+
+@_serialized
+def update_users(updates):
+    """Apply {user_id: {field: value}} for many users with a single save
+    Returns: number of users updated
+    """
+    df = _table()
+    applied = []
+    for uid, fields in updates.items():
+        row = _row(uid)
+        if row is None or not fields:
+            continue
+        df.loc[row, list(fields)] = list(fields.values())
+        applied.append((uid, fields))
+
+    if applied:
+        save_db(df)
+        for uid, fields in applied:
+            changes.append("update", uid, dict(fields))
+    return len(applied)
 
 
 def update_user_details(uid, name, email, age, phone, dept):
     """Update all user details at once"""
-    df = load_db()
-    idx = df.index[df["user_id"] == uid]
-    if idx.empty:
-        return False
-
-    df.loc[idx[0], ["name", "email", "age", "phone", "dept"]] = [name, email, age, phone, dept]
-    save_db(df)
-    return True
+    fields = {"name": name, "email": email, "age": age, "phone": phone, "dept": dept}
+    return update_users({uid: fields}) == 1
 
 
 def update_user_field(uid, field, value):
     """Update a single user field"""
-    df = load_db()
-    idx = df.index[df["user_id"] == uid]
-    if idx.empty:
-        return False
-
-    df.loc[idx[0], field] = value
-    save_db(df)
-    return True
+    return update_users({uid: {field: value}}) == 1
 
 
 def update_admin_pin(uid, new_pin):
     """Update admin PIN"""
-    df = load_db()
-    idx = df.index[df["user_id"] == uid]
-    if idx.empty:
-        return False
-
-    df.loc[idx[0], "admin_pin"] = new_pin
-    save_db(df)
-    return True
+    return update_users({uid: {"admin_pin": new_pin}}) == 1
 
 
 def update_login_timestamp(uid):
     """Update last login timestamp"""
-    df = load_db()
-    idx = df.index[df["user_id"] == uid]
-    if idx.empty:
-        return False
-
-    df.loc[idx[0], "last_login"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    save_db(df)
-    return True
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return update_users({uid: {"last_login": now}}) == 1
 
 
 def update_logout_timestamp(uid):
     """Update last logout timestamp"""
-    df = load_db()
-    idx = df.index[df["user_id"] == uid]
-    if idx.empty:
-        return False
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return update_users({uid: {"last_logout": now}}) == 1
 
-    df.loc[idx[0], "last_logout"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    save_db(df)
-    return True
+
+@_serialized
+def delete_users(uids):
+    """Delete many users and their images with a single save
+    Returns: number of users deleted
+    """
+    df = _table()
+    rows = [row for row in (_row(uid) for uid in uids) if row is not None]
+    found = [uid for uid in uids if _row(uid) is not None]
+    if rows:
+        save_db(df.drop(index=rows))
+        for uid in found:
+            changes.append("delete", uid)
+
+    for uid in uids:
+        blobs.release_tree(os.path.join(IMG_DIR, uid))
+    return len(found)
 
 
 def delete_user(uid):
     """Delete user and their images"""
-    df = load_db()
-    df = df[df["user_id"] != uid]
-    save_db(df)
-
-    user_dir = os.path.join(IMG_DIR, uid)
-    if os.path.exists(user_dir):
-        import shutil
-        shutil.rmtree(user_dir)
+    delete_users([uid])
     return True
 
 
@@ -205,7 +305,4 @@ def add_user_image(uid, image_path):
 
 def delete_user_image(image_path):
     """Delete a user image"""
-    if os.path.exists(image_path):
-        os.remove(image_path)
-        return True
-    return False
+    return blobs.release(image_path)
@@ -0,0 +1,98 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+import cv2
+import numpy as np
+
+CACHE_FILE = "encoding_cache.sqlite"
+MAX_ENTRIES = 5000
+
+
+class EncodingCache:
+    """Persistent cache of still-image analysis keyed by image content.
+
+    The key is the SHA-256 of the image bytes plus the encoder version
+    (detector, library version, thresholds), so changing any of those
+    misses instead of returning stale encodings. Entries hold the status,
+    face boxes and encoding; the least recently used are evicted past
+    max_entries.
+    """
+
+    def __init__(self, path=CACHE_FILE, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS encodings ("
+            " key TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " boxes TEXT NOT NULL,"
+            " encoding BLOB,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS encodings_lru ON encodings (last_used)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(data, version):
+        return f"{hashlib.sha256(data).hexdigest()}:{version}"
+
+    def get(self, key):
+        """(encoding or None, status, boxes) or None on a miss"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, boxes, encoding FROM encodings WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE encodings SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+
+        status, boxes, blob = row
+        encoding = np.frombuffer(blob, dtype=np.float64).copy() if blob is not None else None
+        return encoding, status, [tuple(b) for b in json.loads(boxes)]
+
+    def put(self, key, encoding, status, boxes):
+        blob = None if encoding is None else np.asarray(encoding, dtype=np.float64).tobytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO encodings (key, status, boxes, encoding, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, status, json.dumps([list(map(int, b)) for b in boxes]), blob, time.time())
+            )
+            self._conn.execute(
+                "DELETE FROM encodings WHERE key IN ("
+                " SELECT key FROM encodings ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def analyze_image_bytes(face, data, cache=None):
+    """Encode a still image given as file bytes, through the cache when given
+    Returns: (image or None, encoding, status, boxes); the image is decoded
+    only on a miss or when the caller needs pixels, so it may be None
+    """
+    key = EncodingCache.key(data, face.encoder_version()) if cache is not None else None
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return (None,) + cached
+
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        return None, None, "Could not read image file", []
+    encoding, status, boxes = face.analyze_still(image)
+    if cache is not None:
+        cache.put(key, encoding, status, boxes)
+    return image, encoding, status, boxes
@@ -0,0 +1,203 @@
+import numpy as np
+
+ENCODING_DIM = 128
+BLOCK_ROWS = 16384        # rows dequantized at a time during a scan
+PQ_SUBSPACES = 16         # 16 sub-vectors of 8 dims -> 16 bytes per face
+PQ_CENTROIDS = 256
+PQ_TRAIN_SAMPLE = 20000
+PQ_ITERATIONS = 12
+
+
+class Float64Codec:
+    """Reference storage: encodings kept exactly as face_recognition returns them"""
+
+    name = "float64"
+    dtype = np.float64
+    # Distances are the true ones; the PCA cascade's pruning relies on that
+    exact = True
+
+    def __init__(self, dim=ENCODING_DIM):
+        self.dim = dim
+        self.fitted_on = 0
+
+    @property
+    def code_width(self):
+        return self.dim
+
+    @property
+    def bytes_per_code(self):
+        return self.code_width * np.dtype(self.dtype).itemsize
+
+    def fit(self, encodings):
+        self.fitted_on = len(encodings)
+        return self
+
+    def needs_fit(self, encoding, count):
+        """True if storing encoding as one of count codes calls for a (re)fit"""
+        return False
+
+    def encode(self, x):
+        return np.asarray(x, dtype=self.dtype)
+
+    def decode(self, codes):
+        return np.asarray(codes, dtype=np.float64)
+
+    def distances(self, query, codes):
+        """Euclidean distance from a float query to every stored code"""
+        out = np.empty(len(codes), dtype=np.float64)
+        for start in range(0, len(codes), BLOCK_ROWS):
+            block = self.decode(codes[start:start + BLOCK_ROWS])
+            out[start:start + len(block)] = np.linalg.norm(block - query, axis=1)
+        return out
+
+
+class Float16Codec(Float64Codec):
+    """Half precision: 256 bytes per face, errors around 1e-4 in distance"""
+
+    name = "float16"
+    dtype = np.float16
+    exact = False
+
+
+class Int8Codec(Float64Codec):
+    """Per-dimension symmetric int8 scaling: 128 bytes per face.
+
+    Each dimension gets its own scale from the gallery's largest absolute
+    value; the query stays in float (asymmetric distance). A new encoding
+    outside that range asks for a refit instead of being clipped.
+    """
+
+    name = "int8"
+    dtype = np.int8
+    exact = False
+
+    def __init__(self, dim=ENCODING_DIM):
+        super().__init__(dim)
+        self.peak = np.ones(dim)
+        self.scale = np.full(dim, 1.0 / 127, dtype=np.float32)
+
+    def fit(self, encodings):
+        encodings = np.asarray(encodings, dtype=np.float64)
+        if len(encodings):
+            self.peak = np.maximum(np.abs(encodings).max(axis=0), 1e-6)
+            self.scale = (self.peak / 127).astype(np.float32)
+        self.fitted_on = len(encodings)
+        return self
+
+    def needs_fit(self, encoding, count):
+        return self.fitted_on == 0 or bool(np.any(np.abs(encoding) > self.peak))
+
+    def encode(self, x):
+        q = np.rint(np.asarray(x, dtype=np.float64) / self.scale)
+        return np.clip(q, -127, 127).astype(np.int8)
+
+    def decode(self, codes):
+        return np.asarray(codes, dtype=np.float32) * self.scale
+
+
+class PQCodec(Float64Codec):
+    """Product quantization with asymmetric distance computation (ADC).
+
+    The 128-d vector is split into PQ_SUBSPACES sub-vectors, each replaced by
+    the index of its nearest of 256 centroids (one byte). A query builds a
+    small table of distances to every centroid; a gallery distance is then
+    just a sum of table lookups. The codebooks are retrained once the
+    gallery has doubled since the last fit.
+    """
+
+    name = "pq"
+    dtype = np.uint8
+    exact = False
+
+    def __init__(self, dim=ENCODING_DIM, subspaces=PQ_SUBSPACES, centroids=PQ_CENTROIDS):
+        super().__init__(dim)
+        if dim % subspaces:
+            raise ValueError("dim must be divisible by subspaces")
+        self.subspaces = subspaces
+        self.sub_dim = dim // subspaces
+        self.centroids = centroids
+        self.codebooks = None
+
+    @property
+    def code_width(self):
+        return self.subspaces
+
+    def fit(self, encodings, seed=0):
+        encodings = np.asarray(encodings, dtype=np.float64)
+        self.fitted_on = len(encodings)
+        rng = np.random.default_rng(seed)
+        if len(encodings) > PQ_TRAIN_SAMPLE:
+            encodings = encodings[rng.choice(len(encodings), PQ_TRAIN_SAMPLE, replace=False)]
+        k = max(1, min(self.centroids, len(encodings)))
+
+        books = np.zeros((self.subspaces, self.centroids, self.sub_dim), dtype=np.float32)
+        for m in range(self.subspaces):
+            sub = encodings[:, m * self.sub_dim:(m + 1) * self.sub_dim]
+            books[m, :k] = _kmeans(sub, k, rng)
+            # unused slots (tiny galleries) repeat the first centroid
+            books[m, k:] = books[m, 0]
+        self.codebooks = books
+        return self
+
+    def needs_fit(self, encoding, count):
+        return self.codebooks is None or count > 2 * self.fitted_on
+
+    def encode(self, x):
+        single = np.ndim(x) == 1
+        x = np.atleast_2d(np.asarray(x, dtype=np.float64))
+        codes = np.empty((len(x), self.subspaces), dtype=np.uint8)
+        for m in range(self.subspaces):
+            sub = x[:, m * self.sub_dim:(m + 1) * self.sub_dim]
+            codes[:, m] = _nearest(sub, self.codebooks[m])
+        return codes[0] if single else codes
+
+    def decode(self, codes):
+        single = np.ndim(codes) == 1
+        codes = np.atleast_2d(codes)
+        parts = [self.codebooks[m][codes[:, m]] for m in range(self.subspaces)]
+        decoded = np.concatenate(parts, axis=1).astype(np.float64)
+        return decoded[0] if single else decoded
+
+    def distances(self, query, codes):
+        query = np.asarray(query, dtype=np.float64)
+        table = np.empty((self.subspaces, self.centroids), dtype=np.float64)
+        for m in range(self.subspaces):
+            sub = query[m * self.sub_dim:(m + 1) * self.sub_dim]
+            table[m] = ((self.codebooks[m] - sub) ** 2).sum(axis=1)
+
+        codes = np.atleast_2d(codes)
+        squared = np.zeros(len(codes), dtype=np.float64)
+        for m in range(self.subspaces):
+            squared += table[m][codes[:, m]]
+        return np.sqrt(squared)
+
+
+CODECS = {
+    "float64": Float64Codec,
+    "float16": Float16Codec,
+    "int8": Int8Codec,
+    "pq": PQCodec
+}
+
+
+def make_codec(storage="float64"):
+    try:
+        return CODECS[storage]()
+    except KeyError:
+        raise ValueError(f"Unknown encoding storage '{storage}' (use one of {', '.join(CODECS)})")
+
+
+def _nearest(points, centers):
+    d = (points ** 2).sum(axis=1)[:, None] - 2 * points @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+    return d.argmin(axis=1)
+
+
+def _kmeans(points, k, rng):
+    centers = points[rng.choice(len(points), k, replace=False)].copy()
+    for _ in range(PQ_ITERATIONS):
+        labels = _nearest(points, centers)
+        for c in range(k):
+            members = points[labels == c]
+            if len(members):
+                centers[c] = members.mean(axis=0)
+    return centers
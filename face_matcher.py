@@ -0,0 +1,373 @@
+import json
+import os
+import numpy as np
+
+from encoding_quant import BLOCK_ROWS, make_codec
+
+TOLERANCE = 0.45
+ENCODING_DIM = 128
+
+# In-memory template storage: "float64", "float16", "int8" or "pq"
+ENCODING_STORAGE = "float64"
+
+# Coarse-to-fine matching
+PCA_FILE = "pca_model.npz"
+PCA_DIMS = 24
+PCA_MIN_GALLERY = 64      # below this an exact scan is already cheap
+SHORTLIST_K = 32
+
+
+class PCAProjection:
+    """Orthonormal projection of 128-d encodings onto their top principal axes.
+
+    Because the axes are orthonormal, distances in the reduced space never
+    exceed the true distances, which lets the cascade prove when its
+    shortlist already contains the exact answer.
+    """
+
+    def __init__(self, mean, components, fitted_on=0):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.components = np.asarray(components, dtype=np.float64)
+        self.fitted_on = int(fitted_on)
+
+    @property
+    def dims(self):
+        return self.components.shape[0]
+
+    @classmethod
+    def fit(cls, encodings, dims=PCA_DIMS):
+        encodings = np.asarray(encodings, dtype=np.float64)
+        mean = encodings.mean(axis=0)
+        # Rows of vt are the principal axes, strongest first
+        _, _, vt = np.linalg.svd(encodings - mean, full_matrices=False)
+        return cls(mean, vt[:dims], fitted_on=len(encodings))
+
+    def project(self, x):
+        return (np.asarray(x, dtype=np.float64) - self.mean) @ self.components.T
+
+    def save(self, path=PCA_FILE):
+        np.savez(path, mean=self.mean, components=self.components, fitted_on=self.fitted_on)
+
+    @classmethod
+    def load(cls, path=PCA_FILE):
+        if not os.path.exists(path):
+            return None
+        try:
+            data = np.load(path)
+            return cls(data["mean"], data["components"], data["fitted_on"])
+        except Exception as e:
+            print(f"PCA model error: {e}")
+            return None
+
+
+class EncodingIndex:
+    """In-memory gallery of face encodings keyed by user_id.
+
+    Encodings live in one contiguous code matrix (float64, or a quantized
+    form chosen by `storage`); a dict maps each user_id to its row so
+    single-user lookups never scan the gallery. Removal swaps the last row
+    into the freed slot so rows stay packed. Quantized storage retrains its
+    codec when an enrollment needs it (first encodings, values out of
+    range, a much larger gallery) and always scans: the PCA cascade needs
+    exact distances.
+    """
+
+    def __init__(self, storage=ENCODING_STORAGE):
+        self.storage = storage
+        self.codec = make_codec(storage)
+        self._codes = np.empty((16, self.codec.code_width), dtype=self.codec.dtype)
+        self._count = 0
+        self.projection = None
+        self._reduced = None
+        self._row_of = {}
+        self._user_ids = []
+        self._records = {}
+
+    @classmethod
+    def from_dataframe(cls, df, storage=ENCODING_STORAGE):
+        """Build the index from the rows returned by database_manager.load_db()"""
+        return cls.from_records(df.to_dict("records"), storage)
+
+    @classmethod
+    def from_records(cls, records, storage=ENCODING_STORAGE):
+        """Build the index from user records in bulk, fitting the codec once"""
+        index = cls(storage)
+        records = list(records)
+        # Quantizers learn their scales/codebooks from the enrolled set
+        encodings = [e for e in (parse_encoding(r.get("face_encoding")) for r in records) if e is not None]
+        if encodings:
+            index.codec.fit(np.vstack(encodings))
+        for record in records:
+            index.add(record)
+        return index
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, user_id):
+        return user_id in self._row_of
+
+    # =========================
+    # LOOKUP
+    # =========================
+    @property
+    def matrix(self):
+        """(N, 128) enrolled encodings, row i belongs to user_ids[i]
+        A view for float64 storage, a decoded copy for quantized storage
+        """
+        return self.codec.decode(self._codes[:self._count])
+
+    @property
+    def memory_bytes(self):
+        """Bytes held by the template codes (excluding records)"""
+        return self._count * self.codec.bytes_per_code
+
+    @property
+    def user_ids(self):
+        return self._user_ids
+
+    def get(self, user_id):
+        """User record (as stored in the database) or None"""
+        return self._records.get(user_id)
+
+    def encoding(self, user_id):
+        row = self._row_of.get(user_id)
+        if row is None:
+            return None
+        return self.codec.decode(self._codes[row])
+
+    def verify(self, user_id, encoding, tolerance=TOLERANCE):
+        """1:1 check against a single template
+        Returns: (matched, distance), or (False, None) for an unknown user_id
+        """
+        row = self._row_of.get(user_id)
+        if row is None:
+            return False, None
+        distance = float(self.codec.distances(encoding, self._codes[row:row + 1])[0])
+        return distance <= tolerance, distance
+
+    def match(self, encoding, tolerance=TOLERANCE):
+        """1:N identification, nearest enrolled face within tolerance
+        Returns: (user_id or None, distance of the nearest face or None)
+        """
+        result = self.identify(encoding, k=1, tolerance=tolerance)
+        return result["user_id"], result["distance"]
+
+    def identify(self, encoding, k=3, tolerance=TOLERANCE, shortlist=SHORTLIST_K):
+        """Top-k identification with the best-vs-second margin
+        Uses the PCA cascade when a projection is set, otherwise a blockwise
+        scan that keeps a running top-k with argpartition (no full sort).
+        The candidates are exact whenever the best face is within tolerance;
+        for a rejected face only the decision is guaranteed.
+        Returns: dict with user_id (None if no match), distance, margin and
+        candidates [(user_id, distance), ...] nearest first
+        """
+        result = {"user_id": None, "distance": None, "margin": None, "candidates": []}
+        if self._count == 0:
+            return result
+
+        if self.projection is None or not self.codec.exact or self._count <= max(k, shortlist):
+            rows, dists = self._scan_top_k(encoding, k)
+        else:
+            rows, dists = self._cascade_top_k(encoding, k, max(k, shortlist), tolerance)
+
+        order = np.argsort(dists)
+        rows, dists = rows[order], dists[order]
+        result["candidates"] = [(self._user_ids[r], float(d)) for r, d in zip(rows, dists)]
+        result["distance"] = float(dists[0])
+        if len(dists) > 1:
+            result["margin"] = float(dists[1] - dists[0])
+        if dists[0] <= tolerance:
+            result["user_id"] = self._user_ids[rows[0]]
+        return result
+
+    def _scan_top_k(self, encoding, k, block_rows=BLOCK_ROWS):
+        """Exact top-k over the whole gallery, one block at a time"""
+        best_rows = np.empty(0, dtype=np.intp)
+        best_dists = np.empty(0, dtype=np.float64)
+        for start in range(0, self._count, block_rows):
+            stop = min(start + block_rows, self._count)
+            dists = self.codec.distances(encoding, self._codes[start:stop])
+            rows = np.concatenate([best_rows, np.arange(start, stop)])
+            dists = np.concatenate([best_dists, dists])
+            if len(dists) > k:
+                keep = np.argpartition(dists, k - 1)[:k]
+                rows, dists = rows[keep], dists[keep]
+            best_rows, best_dists = rows, dists
+        return best_rows, best_dists
+
+    def _cascade_top_k(self, encoding, k, shortlist, tolerance):
+        """Coarse PCA shortlist, re-ranked with full-dimension distances"""
+        query = self.projection.project(encoding)
+        coarse = np.linalg.norm(self._reduced[:self._count] - query, axis=1)
+        rows = np.argpartition(coarse, shortlist - 1)[:shortlist]
+        kth_coarse = coarse[rows].max()
+
+        # Fine pass: full 128-d distance on the shortlist only
+        dists = self.codec.distances(encoding, self._codes[rows])
+        keep = np.argpartition(dists, k - 1)[:k]
+        rows, dists = rows[keep], dists[keep]
+
+        # Reduced distances never exceed the real ones, so rows outside the
+        # shortlist are at least kth_coarse away. They can only enter the
+        # top-k (or flip the decision) if that bound is below the current
+        # k-th distance (capped at the tolerance once nothing matched yet).
+        bound = dists.max()
+        if dists.min() > tolerance:
+            bound = min(bound, tolerance)
+        if kth_coarse < bound:
+            extra_rows = np.setdiff1d(np.flatnonzero(coarse < bound), rows, assume_unique=True)
+            if len(extra_rows):
+                extra = self.codec.distances(encoding, self._codes[extra_rows])
+                rows = np.concatenate([rows, extra_rows])
+                dists = np.concatenate([dists, extra])
+                keep = np.argpartition(dists, k - 1)[:k]
+                rows, dists = rows[keep], dists[keep]
+        return rows, dists
+
+    def exact_match(self, encoding, tolerance=TOLERANCE):
+        """Reference full scan over every enrolled encoding"""
+        if self._count == 0:
+            return None, None
+        distances = self.codec.distances(encoding, self._codes[:self._count])
+        row = distances.argmin()
+        if distances[row] <= tolerance:
+            return self._user_ids[row], float(distances[row])
+        return None, float(distances[row])
+
+    def set_projection(self, projection):
+        """Attach (or drop, with None) a PCA projection and reproject the gallery"""
+        self.projection = projection
+        if projection is None:
+            self._reduced = None
+            return
+        self._reduced = np.empty((len(self._codes), projection.dims), dtype=np.float64)
+        if self._count:
+            self._reduced[:self._count] = projection.project(self.matrix)
+
+    def projection_due(self, path=PCA_FILE):
+        """Whether ensure_projection would load or refit the PCA model"""
+        if not self.codec.exact:
+            return False
+        if self.projection is None:
+            return self._count >= PCA_MIN_GALLERY or os.path.exists(path)
+        return self._count >= PCA_MIN_GALLERY and self._count > 2 * self.projection.fitted_on
+
+    def ensure_projection(self, path=PCA_FILE):
+        """Load the stored PCA model, fitting and saving one when missing or outgrown
+        Quantized storage has no cascade, so nothing is loaded for it
+        """
+        if not self.codec.exact:
+            return None
+        if self.projection is None:
+            projection = PCAProjection.load(path)
+            if projection is not None and projection.components.shape[1] == ENCODING_DIM:
+                self.set_projection(projection)
+
+        if self._count < PCA_MIN_GALLERY:
+            return self.projection
+        if self.projection is None or self._count > 2 * self.projection.fitted_on:
+            projection = PCAProjection.fit(self.matrix)
+            projection.save(path)
+            self.set_projection(projection)
+        return self.projection
+
+    # =========================
+    # UPDATES
+    # =========================
+    def add(self, record):
+        """Insert or replace a user; returns False if the encoding is unusable"""
+        encoding = parse_encoding(record.get("face_encoding"))
+        if encoding is None:
+            return False
+
+        user_id = record["user_id"]
+        row = self._row_of.get(user_id)
+        if row is None:
+            if self._count == len(self._codes):
+                grown = np.empty((2 * len(self._codes), self.codec.code_width), dtype=self.codec.dtype)
+                grown[:self._count] = self._codes[:self._count]
+                self._codes = grown
+                if self._reduced is not None:
+                    reduced = np.empty((len(grown), self.projection.dims), dtype=np.float64)
+                    reduced[:self._count] = self._reduced[:self._count]
+                    self._reduced = reduced
+            row = self._count
+            self._count += 1
+            self._row_of[user_id] = row
+            self._user_ids.append(user_id)
+
+        self._records[user_id] = dict(record)
+        if self.codec.needs_fit(encoding, self._count):
+            self._refit_codec()
+        else:
+            self._codes[row] = self.codec.encode(encoding)
+        if self._reduced is not None:
+            self._reduced[row] = self.projection.project(encoding)
+        return True
+
+    def _refit_codec(self):
+        """Train a new codec on every enrolled encoding and re-encode all rows
+        The codes go to a new matrix, so copies sharing the old one keep it
+        """
+        encodings = np.vstack([parse_encoding(self._records[uid].get("face_encoding")) for uid in self._user_ids])
+        codec = make_codec(self.storage).fit(encodings)
+        codes = np.empty((len(self._codes), codec.code_width), dtype=codec.dtype)
+        codes[:self._count] = codec.encode(encodings)
+        self.codec, self._codes = codec, codes
+
+    def update_record(self, user_id, fields):
+        """Update non-encoding fields of a cached record"""
+        record = self._records.get(user_id)
+        if record is not None:
+            # Replaced rather than mutated, so copies of the index keep their version
+            self._records[user_id] = {**record, **fields}
+
+    def copy(self, share_codes=False):
+        """Independent index over the same data
+        With share_codes the code matrix is shared; only safe when the copy
+        writes nothing but rows past the original's count (appends).
+        """
+        clone = EncodingIndex.__new__(EncodingIndex)
+        clone.__dict__.update(self.__dict__)
+        if not share_codes:
+            clone._codes = self._codes.copy()
+            if self._reduced is not None:
+                clone._reduced = self._reduced.copy()
+        clone._row_of = dict(self._row_of)
+        clone._user_ids = list(self._user_ids)
+        clone._records = dict(self._records)
+        return clone
+
+    def remove(self, user_id):
+        row = self._row_of.pop(user_id, None)
+        if row is None:
+            return False
+        self._records.pop(user_id, None)
+
+        last = self._count - 1
+        if row != last:
+            moved = self._user_ids[last]
+            self._codes[row] = self._codes[last]
+            if self._reduced is not None:
+                self._reduced[row] = self._reduced[last]
+            self._user_ids[row] = moved
+            self._row_of[moved] = row
+        self._user_ids.pop()
+        self._count -= 1
+        return True
+
+
+def parse_encoding(value):
+    """Decode a face_encoding cell (JSON list) into a float64 vector"""
+    if isinstance(value, np.ndarray):
+        vec = value.astype(np.float64)
+    else:
+        try:
+            vec = np.asarray(json.loads(value), dtype=np.float64)
+        except (TypeError, ValueError):
+            return None
+    if vec.shape != (ENCODING_DIM,):
+        return None
+    return vec
+
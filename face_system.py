@@ -1,6 +1,8 @@
 import cv2
 import numpy as np
 import os
+import threading
+import time
 from datetime import datetime
 import face_recognition
 
@@ -12,6 +14,26 @@ BLUR_THRESHOLD = 40
 DARK_THRESHOLD = 35
 BRIGHT_THRESHOLD = 220
 
+# Detection runs on a downscaled frame; size limits are given at DEFAULT_SCALE
+DEFAULT_SCALE = 0.5
+MIN_FACE_AREA = 5000
+MAX_FACE_AREA = 40000
+
+# Motion gate: detection only runs when the scene changes
+MOTION_THUMB_SIZE = (32, 24)
+MOTION_THRESHOLD = 4.0        # mean abs grayscale difference (0-255)
+MOTION_HOLD_SECONDS = 3.0     # keep detecting this long after the last change
+IDLE_INTERVAL_MS = 250        # preview rate while the scene is empty
+
+
+def reuse_buffer(buffers, name, shape, dtype=np.uint8):
+    """Return the named preallocated array, reallocating only if the shape changed"""
+    buf = buffers.get(name)
+    if buf is None or buf.shape != shape or buf.dtype != dtype:
+        buf = np.empty(shape, dtype=dtype)
+        buffers[name] = buf
+    return buf
+
 
 class FaceSystem:
 
@@ -31,6 +53,16 @@ class FaceSystem:
         self.prev_face_location = None
         self.movement_detected = False
 
+        # Detection scale, lowered by the frame governor on slow machines
+        self.scale = DEFAULT_SCALE
+
+        # Reused work buffers (see reuse_buffer)
+        self._buffers = {}
+
+        # process() may run on the preview's detection thread and on the Tk
+        # thread (capture); the lock keeps buffers and liveness state consistent
+        self._lock = threading.Lock()
+
     def log_breach(self, frame):
         """Log unidentified face with timestamp"""
         name = f"BREACH_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jpg"
@@ -40,6 +72,9 @@ class FaceSystem:
 
     def check_liveness(self, face_location):
         """Simple liveness detection based on movement"""
+        # Kept in full-frame coordinates: the governor may change the
+        # detection scale between two calls
+        face_location = tuple(v / self.scale for v in face_location)
         if self.prev_face_location is None:
             self.prev_face_location = face_location
             return "Checking liveness..."
@@ -48,7 +83,7 @@ class FaceSystem:
         prev_top, prev_right, prev_bottom, prev_left = self.prev_face_location
         top, right, bottom, left = face_location
         
-        movement = abs(top - prev_top) + abs(left - prev_left)
+        movement = (abs(top - prev_top) + abs(left - prev_left)) * DEFAULT_SCALE
         
         self.prev_face_location = face_location
         
@@ -60,19 +95,57 @@ class FaceSystem:
                 return "Move slightly to verify"
             return "Face OK"
 
-    def process(self, frame):
+    def process(self, frame, scale=None):
         """
         Process frame and return encoding, status, and face locations
+        Face locations are in coordinates of the frame scaled by self.scale
         Returns: (encoding, status_message, face_locations)
         """
         if frame is None:
             return None, "No Frame", []
 
-        # Resize for speed
-        small = cv2.resize(frame, (0, 0), fx=0.5, fy=0.5)
+        with self._lock:
+            if scale is not None:
+                self.scale = scale
+            return self._process(frame)
+
+    def analyze_still(self, image):
+        """
+        Same checks as process() for a single still image (e.g. an upload):
+        fixed DEFAULT_SCALE and no liveness step, so the result depends only
+        on the image and can be cached.
+        Face locations are in coordinates of the image scaled by DEFAULT_SCALE
+        Returns: (encoding, status_message, face_locations)
+        """
+        if image is None:
+            return None, "No Frame", []
+
+        with self._lock:
+            live_scale, self.scale = self.scale, DEFAULT_SCALE
+            try:
+                return self._process(image, liveness=False)
+            finally:
+                self.scale = live_scale
+
+    def encoder_version(self):
+        """Identifies everything analyze_still's result depends on (for caches)"""
+        version = getattr(face_recognition, "__version__", "unknown")
+        return (
+            f"hog/fr-{version}/s{DEFAULT_SCALE}/b{BLUR_THRESHOLD}/d{DARK_THRESHOLD}"
+            f"/l{BRIGHT_THRESHOLD}/a{MIN_FACE_AREA}-{MAX_FACE_AREA}"
+        )
+
+    def _process(self, frame, liveness=True):
+        # Resize for speed, into buffers reused across frames
+        height, width = frame.shape[:2]
+        size = (max(1, int(width * self.scale)), max(1, int(height * self.scale)))
+        small = reuse_buffer(self._buffers, "small", (size[1], size[0], 3))
+        rgb = reuse_buffer(self._buffers, "rgb", (size[1], size[0], 3))
+        gray = reuse_buffer(self._buffers, "gray", (size[1], size[0]))
 
-        rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
-        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        cv2.resize(frame, size, dst=small, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=rgb)
+        cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=gray)
 
         # Lighting check
         brightness = gray.mean()
@@ -91,8 +164,9 @@ class FaceSystem:
         faces = face_recognition.face_locations(rgb, model="hog")
 
         if len(faces) == 0:
-            self.prev_face_location = None
-            self.movement_detected = False
+            if liveness:
+                self.prev_face_location = None
+                self.movement_detected = False
             return None, "No Face Detected", []
 
         if len(faces) > 1:
@@ -106,18 +180,19 @@ class FaceSystem:
         largest_face = max(faces, key=face_area)
         
         # Check if face is too small (too far)
-        area = face_area(largest_face)
-        if area < 5000:  # Minimum face size
+        area = face_area(largest_face) * (DEFAULT_SCALE / self.scale) ** 2
+        if area < MIN_FACE_AREA:
             return None, "Come Closer", faces
         
         # Check if face is too large (too close)
-        if area > 40000:
+        if area > MAX_FACE_AREA:
             return None, "Move Back", faces
 
         # Liveness detection
-        liveness_status = self.check_liveness(largest_face)
-        if liveness_status != "Face OK":
-            return None, liveness_status, faces
+        if liveness:
+            liveness_status = self.check_liveness(largest_face)
+            if liveness_status != "Face OK":
+                return None, liveness_status, faces
 
         # Get encoding
         encodings = face_recognition.face_encodings(rgb, [largest_face])
@@ -125,3 +200,84 @@ class FaceSystem:
             return None, "Face Encoding Failed", faces
 
         return encodings[0], "Face OK", faces
+
+
+class MotionGate:
+    """Cheap presence check run before the expensive HOG detector.
+
+    Each frame is reduced to a tiny grayscale thumbnail and compared with the
+    previous one. Detection is allowed while the scene is changing, for a
+    short hold time afterwards, and while a face is still in view.
+    """
+
+    def __init__(self, threshold=MOTION_THRESHOLD, hold_seconds=MOTION_HOLD_SECONDS,
+                 idle_interval_ms=IDLE_INTERVAL_MS):
+        self.threshold = threshold
+        self.hold_seconds = hold_seconds
+        self.idle_interval_ms = idle_interval_ms
+
+        self.prev_thumb = None
+        self._buffers = {}
+        self.last_active = 0.0
+        self.idle = False
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.frames_seen = 0
+        self.frames_detected = 0
+        self.detect_seconds = 0.0
+        self.started_wall = time.perf_counter()
+        self.started_cpu = time.process_time()
+
+    def check(self, frame):
+        """Return True if the detector should run on this frame"""
+        self.frames_seen += 1
+
+        w, h = MOTION_THUMB_SIZE
+        small = reuse_buffer(self._buffers, "small", (h, w, 3))
+        diff = reuse_buffer(self._buffers, "diff", (h, w))
+        # Alternate between two thumbnail buffers instead of allocating
+        name = "thumb_b" if self.prev_thumb is self._buffers.get("thumb_a") else "thumb_a"
+        thumb = reuse_buffer(self._buffers, name, (h, w))
+
+        cv2.resize(frame, MOTION_THUMB_SIZE, dst=small, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=thumb)
+
+        now = time.perf_counter()
+        if self.prev_thumb is None:
+            self.last_active = now
+        else:
+            cv2.absdiff(thumb, self.prev_thumb, dst=diff)
+            if cv2.mean(diff)[0] > self.threshold:
+                self.last_active = now
+        self.prev_thumb = thumb
+
+        self.idle = now - self.last_active > self.hold_seconds
+        return not self.idle
+
+    def keep_alive(self):
+        """Stay active while a face is in view even if it is holding still"""
+        self.last_active = time.perf_counter()
+        self.idle = False
+
+    def record_detection(self, seconds):
+        self.frames_detected += 1
+        self.detect_seconds += seconds
+
+    def next_interval(self, active_interval_ms):
+        return self.idle_interval_ms if self.idle else active_interval_ms
+
+    def stats(self):
+        """Gate counters plus process CPU usage since the last reset"""
+        wall = max(time.perf_counter() - self.started_wall, 1e-6)
+        cpu = time.process_time() - self.started_cpu
+        skipped = self.frames_seen - self.frames_detected
+        return {
+            "idle": self.idle,
+            "frames_seen": self.frames_seen,
+            "frames_detected": self.frames_detected,
+            "frames_skipped": skipped,
+            "skip_ratio": round(skipped / self.frames_seen, 3) if self.frames_seen else 0.0,
+            "detect_ms_per_sec": round(1000 * self.detect_seconds / wall, 1),
+            "cpu_percent": round(100 * cpu / wall, 1)
+        }
@@ -0,0 +1,145 @@
+import time
+
+TARGET_UI_FPS = 30
+MIN_UI_FPS = 10
+CPU_BUDGET = 0.6              # share of one core the preview loop may use
+DETECT_SCALES = (0.5, 0.4, 0.33, 0.25)
+MAX_DETECT_EVERY = 6          # run detection at least every Nth preview frame
+ADJUST_EVERY = 15             # frames between adjustments
+SMOOTHING = 0.2               # weight of the newest cost sample
+
+
+class FrameGovernor:
+    """Fits the preview loop to a CPU budget.
+
+    Per-frame detection and display costs are measured and smoothed. When the
+    loop is over budget the governor first detects less often, then detects
+    on smaller frames, and finally lowers the preview rate; it steps back up
+    in the reverse order once there is headroom again.
+    """
+
+    def __init__(self, target_fps=TARGET_UI_FPS, cpu_budget=CPU_BUDGET):
+        self.target_fps = target_fps
+        self.cpu_budget = cpu_budget
+
+        self.detect_every = 1
+        self.scale_level = 0
+        self.fps = target_fps
+
+        self.detect_cost = None
+        self.display_cost = None
+        self._frame_no = 0
+        self._since_adjust = 0
+
+    # =========================
+    # SETTINGS
+    # =========================
+    @property
+    def scale(self):
+        return DETECT_SCALES[self.scale_level]
+
+    @property
+    def preview_interval_ms(self):
+        return int(1000 / self.fps)
+
+    @property
+    def underpowered(self):
+        """True once every knob is at its floor and the loop is still over budget"""
+        return (
+            self.detect_every == MAX_DETECT_EVERY
+            and self.scale_level == len(DETECT_SCALES) - 1
+            and self.fps == MIN_UI_FPS
+            and self._load() > 1.0
+        )
+
+    def settings(self):
+        return {
+            "preview_fps": self.fps,
+            "detect_every": self.detect_every,
+            "detect_fps": round(self.fps / self.detect_every, 1),
+            "detect_scale": self.scale,
+            "detect_ms": None if self.detect_cost is None else round(self.detect_cost * 1000, 1),
+            "display_ms": None if self.display_cost is None else round(self.display_cost * 1000, 1),
+            "load": round(self._load(), 2),
+            "underpowered": self.underpowered
+        }
+
+    def summary(self):
+        """One-line description for the on-screen diagnostics label"""
+        text = (f"Preview {self.fps} fps · detect {self.fps / self.detect_every:.1f} fps"
+                f" · scale {self.scale:.2f}")
+        if self.underpowered:
+            text += " · ⚠ Underpowered"
+        return text
+
+    # =========================
+    # LOOP HOOKS
+    # =========================
+    def should_detect(self):
+        """Called once per preview frame"""
+        self._frame_no += 1
+        return self._frame_no % self.detect_every == 0
+
+    def record_detection(self, seconds):
+        self.detect_cost = self._smooth(self.detect_cost, seconds)
+
+    def record_display(self, seconds):
+        self.display_cost = self._smooth(self.display_cost, seconds)
+        self._since_adjust += 1
+        if self._since_adjust >= ADJUST_EVERY:
+            self._since_adjust = 0
+            self._adjust()
+
+    def next_delay(self, started):
+        """Delay until the next tick, discounting the time this tick took"""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        return max(1, int(self.preview_interval_ms - elapsed_ms))
+
+    # =========================
+    # CONTROL
+    # =========================
+    def _smooth(self, current, sample):
+        if current is None:
+            return sample
+        return (1 - SMOOTHING) * current + SMOOTHING * sample
+
+    def _load(self, detect_every=None, scale=None, fps=None):
+        """Estimated share of the CPU budget used at the given settings"""
+        detect_every = detect_every or self.detect_every
+        fps = fps or self.fps
+        detect = self.detect_cost or 0.0
+        if scale is not None:
+            # HOG cost is roughly proportional to the pixel count
+            detect *= (scale / self.scale) ** 2
+        per_frame = (self.display_cost or 0.0) + detect / detect_every
+        return per_frame * fps / self.cpu_budget
+
+    def _set_scale_level(self, level):
+        new_scale = DETECT_SCALES[level]
+        if self.detect_cost is not None:
+            self.detect_cost *= (new_scale / self.scale) ** 2
+        self.scale_level = level
+
+    def _adjust(self):
+        load = self._load()
+
+        if load > 1.0:
+            if self.detect_every < MAX_DETECT_EVERY:
+                self.detect_every += 1
+            elif self.scale_level < len(DETECT_SCALES) - 1:
+                self._set_scale_level(self.scale_level + 1)
+            elif self.fps > MIN_UI_FPS:
+                self.fps = max(MIN_UI_FPS, self.fps - 5)
+            return
+
+        # Step back up only when the predicted load still leaves headroom
+        if self.fps < self.target_fps:
+            fps = min(self.target_fps, self.fps + 5)
+            if self._load(fps=fps) < 0.8:
+                self.fps = fps
+        elif self.scale_level > 0:
+            if self._load(scale=DETECT_SCALES[self.scale_level - 1]) < 0.8:
+                self._set_scale_level(self.scale_level - 1)
+        elif self.detect_every > 1:
+            if self._load(detect_every=self.detect_every - 1) < 0.8:
+                self.detect_every -= 1
@@ -0,0 +1,436 @@
+import json
+import multiprocessing as mp
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection, Listener, answer_challenge, deliver_challenge
+
+import numpy as np
+
+import database_manager as db
+from face_matcher import TOLERANCE, EncodingIndex
+from sharded_matcher import shard_of
+
+NODE_TIMEOUT = 0.5            # seconds a node may take (connect or reply) before it is skipped
+RETRY_AFTER = 5.0             # seconds before a failed node is contacted again
+NODE_HOST = "127.0.0.1"       # nodes only listen on other interfaces when given a host
+
+# Shared secret for node connections; messages are pickles, so anyone holding
+# it can run code on a node. Set per deployment, never in the source.
+AUTHKEY_ENV = "GALLERY_NODE_AUTHKEY"
+MIN_AUTHKEY_LENGTH = 16
+
+# Writes a node missed while unreachable, replayed when it is back
+PENDING_FILE = "gallery_pending.json"
+
+# "host:port" of every matcher node, in partition order; empty = local gallery
+GALLERY_NODES = []
+
+
+def node_authkey():
+    """The deployment's node secret from the environment; refuses to run without one"""
+    key = os.environ.get(AUTHKEY_ENV, "")
+    if len(key) < MIN_AUTHKEY_LENGTH:
+        raise RuntimeError(
+            f"Set {AUTHKEY_ENV} to a secret of at least {MIN_AUTHKEY_LENGTH} characters, "
+            "the same on every matcher node and workstation"
+        )
+    return key.encode("utf-8")
+
+
+# =========================
+# NODE
+# =========================
+def serve_node(address, node_id, num_nodes, authkey=None, records=None):
+    """Run a matcher node owning partition node_id of num_nodes (blocks)
+
+    The node loads its users from the shared database unless records are
+    given, then answers identify/verify/add/remove requests. address may be
+    a bare port, which listens on NODE_HOST only.
+    """
+    authkey = authkey or node_authkey()
+    if isinstance(address, int):
+        address = (NODE_HOST, address)
+    if records is None:
+        records = db.get_all_users().to_dict("records")
+
+    index = EncodingIndex.from_records(r for r in records if shard_of(r["user_id"], num_nodes) == node_id)
+    pca_path = f"pca_model_node{node_id}.npz"
+    index.ensure_projection(pca_path)
+    lock = threading.Lock()
+
+    def handle(conn):
+        with conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+                kind = message[0]
+                with lock:
+                    if kind == "identify":
+                        _, queries, k, tolerance = message
+                        reply = [index.identify(q, k=k, tolerance=tolerance) for q in queries]
+                    elif kind == "verify":
+                        _, user_id, encoding, tolerance = message
+                        reply = index.verify(user_id, encoding, tolerance)
+                    elif kind == "get":
+                        reply = index.get(message[1])
+                    elif kind == "add":
+                        reply = index.add(message[1])
+                        index.ensure_projection(pca_path)
+                    elif kind == "update":
+                        index.update_record(message[1], message[2])
+                        reply = True
+                    elif kind == "remove":
+                        reply = index.remove(message[1])
+                    elif kind == "count":
+                        reply = len(index)
+                    else:
+                        reply = None
+                conn.send(reply)
+
+    with Listener(address, authkey=authkey) as listener:
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=handle, args=(conn,), daemon=True).start()
+
+
+def spawn_local_nodes(num_nodes, base_port=6200, records=None, authkey=None):
+    """Start num_nodes node processes on localhost (for testing)
+    Returns: (processes, addresses)
+    """
+    authkey = authkey or node_authkey()
+    ctx = mp.get_context("spawn")
+    processes, addresses = [], []
+    for node_id in range(num_nodes):
+        address = (NODE_HOST, base_port + node_id)
+        part = None
+        if records is not None:
+            part = [r for r in records if shard_of(r["user_id"], num_nodes) == node_id]
+        proc = ctx.Process(target=serve_node, args=(address, node_id, num_nodes, authkey, part), daemon=True)
+        proc.start()
+        processes.append(proc)
+        addresses.append(address)
+    return processes, addresses
+
+
+def parse_address(value):
+    """"host:port" or a bare port (on NODE_HOST)"""
+    host, _, port = str(value).rpartition(":")
+    return host or NODE_HOST, int(port)
+
+
+def _connect(address, authkey, timeout):
+    """multiprocessing Client() with the connect and handshake bounded by timeout"""
+    sock = socket.create_connection(address, timeout=timeout)
+    try:
+        # Connection needs a blocking socket; socket-level timeouts keep it bounded
+        sock.settimeout(None)
+        if sys.platform == "win32":
+            value = struct.pack("L", int(timeout * 1000))
+        else:
+            value = struct.pack("ll", int(timeout), int(timeout % 1 * 1e6))
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, value)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, value)
+        conn = Connection(sock.detach())
+    finally:
+        sock.close()
+    try:
+        answer_challenge(conn, authkey)
+        deliver_challenge(conn, authkey)
+    except Exception:
+        conn.close()
+        raise
+    return conn
+
+
+# =========================
+# COORDINATOR
+# =========================
+class _NodeLink:
+    """Connection to one node; dropped after a timeout so replies never desync"""
+
+    def __init__(self, address, authkey):
+        self.address = address
+        self.authkey = authkey
+        self.conn = None
+        self.failed_at = None
+        self.lock = threading.Lock()
+
+    def call(self, message, timeout):
+        with self.lock:
+            if self.conn is None:
+                if self.failed_at is not None and time.monotonic() - self.failed_at < RETRY_AFTER:
+                    raise ConnectionError(f"node {self.address} recently failed")
+                try:
+                    self.conn = _connect(self.address, self.authkey, timeout)
+                except Exception:
+                    self.failed_at = time.monotonic()
+                    raise
+            try:
+                self.conn.send(message)
+                if not self.conn.poll(timeout):
+                    raise TimeoutError(f"node {self.address} timed out")
+                reply = self.conn.recv()
+                self.failed_at = None
+                return reply
+            except Exception:
+                self.failed_at = time.monotonic()
+                try:
+                    self.conn.close()
+                finally:
+                    self.conn = None
+                raise
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None:
+                self.conn.close()
+                self.conn = None
+
+
+class GalleryCoordinator:
+    """Identification fanned out over matcher nodes that own hash partitions.
+
+    Every node gets the query in parallel; replies arriving within the
+    timeout are merged into a global top-k. Slow or dead nodes are skipped
+    and the result is marked partial. Inserts, updates and deletes go to the
+    node that owns the user_id; a write to an unreachable node is queued
+    (and saved to disk) and replayed in order by a background thread once
+    the node answers again. Offers the same gallery calls as EncodingIndex.
+    """
+
+    def __init__(self, addresses, timeout=NODE_TIMEOUT, authkey=None, pending_file=PENDING_FILE):
+        authkey = authkey or node_authkey()
+        self.links = [_NodeLink(a, authkey) for a in addresses]
+        self.timeout = timeout
+        self.pending_file = pending_file
+        self._pool = ThreadPoolExecutor(max_workers=len(self.links))
+        self._pending = self._load_pending()
+        self._pending_lock = threading.RLock()
+        self._stop = threading.Event()
+        self._replayer = threading.Thread(target=self._replay_loop, daemon=True)
+        self._replayer.start()
+
+    def close(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False)
+        for link in self.links:
+            link.close()
+
+    def wait_ready(self, timeout=10.0):
+        """Block until every node accepts connections (freshly spawned nodes)"""
+        deadline = time.monotonic() + timeout
+        for link in self.links:
+            while True:
+                link.failed_at = None
+                try:
+                    link.call(("count",), self.timeout)
+                    break
+                except Exception:
+                    if time.monotonic() > deadline:
+                        return False
+                    time.sleep(0.1)
+        return True
+
+    def __len__(self):
+        counts = self._scatter(("count",))
+        return sum(c for c in counts.values())
+
+    def _owner_index(self, user_id):
+        return shard_of(user_id, len(self.links))
+
+    def _owner(self, user_id):
+        return self.links[self._owner_index(user_id)]
+
+    def _scatter(self, message):
+        """Send to every node; returns {node_index: reply} for nodes that answered"""
+        futures = {i: self._pool.submit(link.call, message, self.timeout) for i, link in enumerate(self.links)}
+        replies = {}
+        for i, future in futures.items():
+            try:
+                replies[i] = future.result()
+            except Exception as e:
+                print(f"Gallery node {self.links[i].address} unavailable: {e}")
+        return replies
+
+    # =========================
+    # LOOKUP
+    # =========================
+    def identify(self, encoding, k=3, tolerance=TOLERANCE):
+        return self.identify_batch(np.asarray(encoding)[None, :], k, tolerance)[0]
+
+    def identify_batch(self, encodings, k=3, tolerance=TOLERANCE):
+        """Like EncodingIndex.identify, plus partial / missing_nodes per result"""
+        queries = np.ascontiguousarray(encodings, dtype=np.float64)
+        replies = self._scatter(("identify", queries, k, tolerance))
+        missing = [self.links[i].address for i in range(len(self.links)) if i not in replies]
+        # Deleted users whose node has not been told yet must not match
+        removed = self._queued_removals()
+
+        results = []
+        for q in range(len(queries)):
+            candidates = sorted(
+                (d, uid) for answers in replies.values() for uid, d in answers[q]["candidates"]
+                if uid not in removed
+            )[:k]
+            result = {
+                "user_id": None,
+                "distance": None,
+                "margin": None,
+                "candidates": [(uid, d) for d, uid in candidates],
+                "partial": bool(missing),
+                "missing_nodes": missing
+            }
+            if candidates:
+                result["distance"] = candidates[0][0]
+                if candidates[0][0] <= tolerance:
+                    result["user_id"] = candidates[0][1]
+                if len(candidates) > 1:
+                    result["margin"] = candidates[1][0] - candidates[0][0]
+            results.append(result)
+        return results
+
+    def match(self, encoding, tolerance=TOLERANCE):
+        result = self.identify(encoding, k=1, tolerance=tolerance)
+        return result["user_id"], result["distance"]
+
+    def verify(self, user_id, encoding, tolerance=TOLERANCE):
+        """Like EncodingIndex.verify; raises ConnectionError if the owning node is down,
+        so an outage is not mistaken for a wrong face
+        """
+        if user_id in self._queued_removals():
+            return False, None
+        try:
+            return self._owner(user_id).call(
+                ("verify", user_id, np.asarray(encoding, dtype=np.float64), tolerance), self.timeout)
+        except Exception as e:
+            raise ConnectionError(f"Gallery node for {user_id} unavailable: {e}") from e
+
+    def get(self, user_id):
+        try:
+            return self._owner(user_id).call(("get", user_id), self.timeout)
+        except Exception as e:
+            print(f"Gallery lookup failed: {e}")
+            return None
+
+    # =========================
+    # UPDATES
+    # =========================
+    def add(self, record):
+        self._write(record["user_id"], ("add", dict(record)))
+        return True
+
+    def update_record(self, user_id, fields):
+        self._write(user_id, ("update", user_id, dict(fields)))
+
+    def remove(self, user_id):
+        self._write(user_id, ("remove", user_id))
+        return True
+
+    def ensure_projection(self, path=None):
+        """Each node maintains its own PCA model"""
+        return None
+
+    @property
+    def pending_writes(self):
+        """Writes queued for nodes that were unreachable"""
+        with self._pending_lock:
+            return sum(len(queue) for queue in self._pending.values())
+
+    def _write(self, user_id, message):
+        """Send a write to its owner, or queue it behind earlier ones that did not arrive
+        The call is made outside the queue lock, so lookups never wait on a slow node
+        """
+        node = self._owner_index(user_id)
+        with self._pending_lock:
+            queue = self._pending.setdefault(node, deque())
+            send = not queue
+        if send:
+            try:
+                self.links[node].call(message, self.timeout)
+                return
+            except Exception as e:
+                print(f"Gallery node {self.links[node].address} unavailable, change queued: {e}")
+        with self._pending_lock:
+            queue.append(message)
+            self._save_pending()
+
+    def replay(self):
+        """Send queued writes to nodes that answer again; returns how many are left
+        Calls happen outside the queue lock, so lookups are never held up by it
+        """
+        with self._pending_lock:
+            queues = list(self._pending.items())
+        for node, queue in queues:
+            while True:
+                with self._pending_lock:
+                    if not queue:
+                        break
+                    message = queue[0]
+                try:
+                    self.links[node].call(message, self.timeout)
+                except Exception:
+                    break
+                with self._pending_lock:
+                    if queue and queue[0] is message:
+                        queue.popleft()
+                        self._save_pending()
+        return self.pending_writes
+
+    def _replay_loop(self):
+        while not self._stop.wait(RETRY_AFTER):
+            if self.pending_writes:
+                self.replay()
+
+    def _queued_removals(self):
+        with self._pending_lock:
+            removed = set()
+            for queue in self._pending.values():
+                for message in queue:
+                    if message[0] == "remove":
+                        removed.add(message[1])
+                    elif message[0] == "add":
+                        removed.discard(message[1]["user_id"])
+            return removed
+
+    def _load_pending(self):
+        try:
+            with open(self.pending_file, encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if saved.get("nodes") != [list(link.address) for link in self.links]:
+            # Another partitioning: nodes reload from the database on restart anyway
+            return {}
+        return {int(node): deque(tuple(m) for m in queue) for node, queue in saved["queues"].items()}
+
+    def _save_pending(self):
+        state = {
+            "nodes": [list(link.address) for link in self.links],
+            "queues": {node: list(queue) for node, queue in self._pending.items() if queue}
+        }
+        try:
+            tmp = self.pending_file + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f, default=_json_value)
+            os.replace(tmp, self.pending_file)
+        except OSError as e:
+            print(f"Gallery pending-write error: {e}")
+
+
+def _json_value(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+if __name__ == "__main__":
+    # python gallery_nodes.py NODE_ID NUM_NODES [host:]port
+    serve_node(parse_address(sys.argv[3]), int(sys.argv[1]), int(sys.argv[2]))
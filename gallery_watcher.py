@@ -0,0 +1,122 @@
+import json
+import os
+import queue
+import threading
+
+import pandas as pd
+
+import database_manager as db
+from change_log import ORIGIN, ChangeLog
+
+WATCH_INTERVAL = 1.0       # seconds between checks of the log and workbook
+
+
+class GalleryWatcher:
+    """Detects changes made by other app instances sharing the database.
+
+    A background thread polls the change log size and the workbook mtime.
+    New log events are read from the last offset; a workbook edit that did
+    not come with log events (e.g. edited by hand) is diffed against the
+    known records instead. Events this process wrote itself are already in
+    its gallery, so they are only tracked. Either way only the delta is
+    queued, and the owner applies it with drain() on its own thread, so
+    file parsing never blocks lookups.
+    """
+
+    def __init__(self, records, log_path=None, db_file=None, interval=WATCH_INTERVAL):
+        self.log = ChangeLog(log_path or db.changes.path)
+        self.db_file = db_file or db.DB_FILE
+        self.interval = interval
+        self.offset = self.log.size()
+        self.db_mtime = self._mtime()
+        self._records = {r["user_id"]: dict(r) for r in records}
+        self._pending_db_change = False
+        self._events = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def drain(self):
+        """Events detected since the last call, oldest first"""
+        events = []
+        while True:
+            try:
+                events.append(self._events.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _mtime(self):
+        try:
+            return os.stat(self.db_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                print(f"Gallery watcher error: {e}")
+
+    def check(self):
+        """One poll; returns the number of events queued"""
+        queued = 0
+        if self.log.size() != self.offset:
+            events, self.offset = self.log.read_from(self.offset)
+            for event in events:
+                self._track(event)
+                if event.get("origin") != ORIGIN:
+                    self._events.put(event)
+                    queued += 1
+            # The workbook save that came with these events is already covered
+            self._pending_db_change = False
+            self.db_mtime = self._mtime()
+
+        mtime = self._mtime()
+        if mtime != self.db_mtime:
+            if self._pending_db_change:
+                queued += self._diff_workbook()
+                self._pending_db_change = False
+                self.db_mtime = mtime
+            else:
+                # Writers save the workbook before logging; give the log one interval to catch up
+                self._pending_db_change = True
+        return queued
+
+    def _track(self, event):
+        op, user_id = event["op"], event["user_id"]
+        if op == "register":
+            self._records[user_id] = dict(event["data"])
+        elif op == "update" and user_id in self._records:
+            self._records[user_id].update(event["data"])
+        elif op == "delete":
+            self._records.pop(user_id, None)
+
+    def _diff_workbook(self):
+        """Queue register/delete events for rows that differ from the known records"""
+        current = {r["user_id"]: r for r in db.load_db().to_dict("records")}
+        queued = 0
+        for user_id, record in current.items():
+            known = self._records.get(user_id)
+            if known is None or _signature(known) != _signature(record):
+                event = {"seq": None, "op": "register", "user_id": user_id, "data": record}
+                self._track(event)
+                self._events.put(event)
+                queued += 1
+        for user_id in set(self._records) - set(current):
+            event = {"seq": None, "op": "delete", "user_id": user_id, "data": None}
+            self._track(event)
+            self._events.put(event)
+            queued += 1
+        return queued
+
+
+def _signature(record):
+    """Comparable form of a record; missing values read back from Excel as NaN"""
+    return json.dumps({k: "" if pd.isna(v) else str(v) for k, v in record.items()}, sort_keys=True)
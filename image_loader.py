@@ -0,0 +1,106 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import customtkinter as ctk
+from PIL import Image, ImageDraw
+
+LOADER_WORKERS = 2
+IMAGE_CACHE_SIZE = 256        # decoded CTkImages kept for instant revisits
+POLL_MS = 30
+
+
+class AsyncImageLoader:
+    """Decodes thumbnails on a thread pool and hands them to the Tk thread.
+
+    request() returns at once; the callback runs later on the Tk thread
+    with a CTkImage (or None if decoding failed). cancel() drops every
+    pending request, e.g. when the view that asked for them is closed.
+    Decoded images stay in an LRU keyed by path, mtime, size and
+    transform, so revisiting a view needs no decoding at all.
+    """
+
+    def __init__(self, root, thumbs, workers=LOADER_WORKERS, cache_size=IMAGE_CACHE_SIZE):
+        self.root = root
+        self.thumbs = thumbs
+        self.cache_size = cache_size
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._cache = OrderedDict()
+        self._pending = []
+        self._generation = 0
+        self._poll_job = None
+
+    def request(self, path, size, callback, transform=None):
+        """Load path as a size (w, h) CTkImage; transform(PIL image) runs in the worker"""
+        try:
+            key = (path, os.stat(path).st_mtime_ns, size, transform)
+        except OSError:
+            callback(None)
+            return
+
+        image = self._cache.get(key)
+        if image is not None:
+            self._cache.move_to_end(key)
+            callback(image)
+            return
+
+        generation = self._generation
+        future = self._pool.submit(self._decode, key, generation)
+        self._pending.append((future, key, generation, callback))
+        if self._poll_job is None:
+            self._poll_job = self.root.after(POLL_MS, self._poll)
+
+    def cancel(self):
+        """Forget all pending requests; queued decodes are skipped"""
+        self._generation += 1
+        for future, _, _, _ in self._pending:
+            future.cancel()
+        self._pending = []
+
+    def shutdown(self):
+        self.cancel()
+        self._pool.shutdown(wait=False)
+
+    def _decode(self, key, generation):
+        if generation != self._generation:
+            return None
+        path, _, size, transform = key
+        img = self.thumbs.get(path, size)
+        return transform(img) if transform else img
+
+    def _poll(self):
+        still_pending = []
+        for future, key, generation, callback in self._pending:
+            if not future.done():
+                still_pending.append((future, key, generation, callback))
+                continue
+            if generation != self._generation:
+                continue
+            try:
+                img = future.result()
+            except Exception as e:
+                print(f"Image load error: {e}")
+                callback(None)
+                continue
+            if img is None:
+                continue
+
+            # Tk images must be created on the Tk thread
+            image = ctk.CTkImage(img, size=key[2])
+            self._cache[key] = image
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            callback(image)
+
+        self._pending = still_pending
+        self._poll_job = self.root.after(POLL_MS, self._poll) if still_pending else None
+
+
+def circular(img):
+    """RGBA copy of img with everything outside the inscribed circle transparent"""
+    mask = Image.new("L", img.size, 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, img.size[0], img.size[1]), fill=255)
+    output = Image.new("RGBA", img.size, (0, 0, 0, 0))
+    output.paste(img, (0, 0))
+    output.putalpha(mask)
+    return output
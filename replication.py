@@ -0,0 +1,114 @@
+import json
+import os
+import sys
+import time
+
+import database_manager as db
+from change_log import ChangeLog, apply_event
+from face_matcher import ENCODING_STORAGE, TOLERANCE, EncodingIndex
+
+SNAPSHOT_FILE = "gallery_snapshot.json"
+
+
+def export_snapshot(path=SNAPSHOT_FILE, log=None):
+    """Write every user plus the change-log position the snapshot covers
+
+    The log position is taken before the table is read, so a replica that
+    replays from it may see a few events already in the snapshot; applying
+    events is idempotent, so that is harmless.
+    """
+    log = log or db.changes
+    seq, offset = log.position()
+    users = db.get_all_users().to_dict("records")
+
+    snapshot = {"seq": seq, "log_offset": offset, "created": time.time(), "users": users}
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, default=str)
+    os.replace(tmp, path)
+    return {"users": len(users), "seq": seq}
+
+
+class Replica:
+    """Read-only gallery built from a snapshot and kept current from the change log.
+
+    poll() reads only the events appended since the last call, so catching
+    up costs time proportional to the new changes, not to the table size.
+    """
+
+    def __init__(self, snapshot_path=SNAPSHOT_FILE, log_path=None, storage=ENCODING_STORAGE):
+        with open(snapshot_path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+
+        self.log = ChangeLog(log_path or db.changes.path)
+        self._index = EncodingIndex.from_records(snapshot["users"], storage)
+        self._index.ensure_projection()
+
+        self.applied_seq = snapshot["seq"]
+        self.offset = snapshot["log_offset"]
+        self.last_event_ts = snapshot["created"]
+        self.apply_delay = 0.0
+        self.poll_ms = 0.0
+
+    def poll(self):
+        """Apply new change-log events; returns how many were applied"""
+        started = time.perf_counter()
+        events, self.offset = self.log.read_from(self.offset)
+        applied = 0
+        for event in events:
+            if event["seq"] <= self.applied_seq:
+                continue
+            apply_event(self._index, event)
+            self.applied_seq = event["seq"]
+            self.last_event_ts = event["ts"]
+            applied += 1
+        if applied:
+            self.apply_delay = time.time() - self.last_event_ts
+            self._index.ensure_projection()
+        self.poll_ms = (time.perf_counter() - started) * 1000
+        return applied
+
+    def lag(self):
+        """Replication lag: bytes of log not yet read and age of the last applied change"""
+        return {
+            "applied_seq": self.applied_seq,
+            "bytes_behind": max(0, self.log.size() - self.offset),
+            "apply_delay_ms": round(self.apply_delay * 1000, 1),
+            "last_poll_ms": round(self.poll_ms, 2)
+        }
+
+    # =========================
+    # LOOKUP
+    # =========================
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, user_id):
+        return user_id in self._index
+
+    def get(self, user_id):
+        return self._index.get(user_id)
+
+    def verify(self, user_id, encoding, tolerance=TOLERANCE):
+        return self._index.verify(user_id, encoding, tolerance)
+
+    def match(self, encoding, tolerance=TOLERANCE):
+        return self._index.match(encoding, tolerance)
+
+    def identify(self, encoding, k=3, tolerance=TOLERANCE):
+        return self._index.identify(encoding, k=k, tolerance=tolerance)
+
+
+if __name__ == "__main__":
+    # python replication.py export [snapshot]  |  python replication.py follow [snapshot]
+    command = sys.argv[1] if len(sys.argv) > 1 else "export"
+    path = sys.argv[2] if len(sys.argv) > 2 else SNAPSHOT_FILE
+    if command == "export":
+        print(export_snapshot(path))
+    else:
+        replica = Replica(path)
+        print(f"Replica loaded {len(replica)} users at seq {replica.applied_seq}")
+        while True:
+            if replica.poll():
+                print(replica.lag())
+            time.sleep(0.5)
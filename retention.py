@@ -0,0 +1,211 @@
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+
+import database_manager as db
+from breach_archive import BREACH_DIR, BREACH_RETENTION_DAYS
+from snapshot_store import SnapshotStore
+
+GALLERY_DIR = "images/gallery"
+STATE_FILE = "retention_state.json"
+
+# Days to keep each category of data
+RETENTION_DAYS = {
+    "breach_logs": BREACH_RETENTION_DAYS,
+    "login_snapshots": 30
+}
+
+SLICE_SECONDS = 0.05          # work done before yielding
+SLICE_ENTRIES = 200           # directory entries examined before yielding
+PAUSE_SECONDS = 0.2           # rest between slices so disk I/O stays light
+PASS_INTERVAL = 6 * 3600      # seconds between full passes
+
+
+class RetentionScheduler:
+    """Deletes expired breach logs and login snapshots in the background.
+
+    Work is split into small slices, bounded both by time and by directory
+    entries examined, separated by pauses. A slice may end inside a folder:
+    its os.scandir iterator stays open across the pause, so the next slice
+    continues from the same entry. After every slice the position (category
+    and last finished folder) is saved, so a pass interrupted by closing the
+    app resumes at the folder it stopped in.
+    """
+
+    def __init__(self, retention=None, state_file=STATE_FILE):
+        self.retention = dict(RETENTION_DAYS, **(retention or {}))
+        self.state_file = state_file
+        self.snapshots = SnapshotStore(GALLERY_DIR)
+        self.reclaimed = {c: {"files": 0, "bytes": 0} for c in list(self.retention) + ["blobs"]}
+        self.passes = 0
+        self.last_pass_seconds = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._cursor = self._load_cursor()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        """Files and bytes reclaimed so far, per category and in total"""
+        return {
+            "passes": self.passes,
+            "last_pass_seconds": self.last_pass_seconds,
+            "files": sum(r["files"] for r in self.reclaimed.values()),
+            "bytes": sum(r["bytes"] for r in self.reclaimed.values()),
+            "by_category": {c: dict(r) for c, r in self.reclaimed.items()}
+        }
+
+    # =========================
+    # SCHEDULING
+    # =========================
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            if not self.run_pass():
+                return
+            self.passes += 1
+            self.last_pass_seconds = round(time.monotonic() - started, 2)
+            stats = self.stats()
+            print(f"Retention: reclaimed {stats['files']} files, {stats['bytes'] / 1e6:.1f} MB")
+            if self._stop.wait(PASS_INTERVAL):
+                return
+
+    def run_pass(self):
+        """One full pass in slices; returns False if stopped midway"""
+        self._slice_start()
+        for category, folder in self._folders():
+            if self._stop.is_set():
+                self._save_cursor()
+                return False
+            try:
+                for _ in self._clean(category, folder):
+                    if self._slice_done() and not self._pause():
+                        return False
+            except OSError as e:
+                print(f"Retention error: {e}")
+            self._cursor = {"category": category, "after": folder}
+            if self._slice_done() and not self._pause():
+                return False
+
+        self._cursor = {}
+        self._save_cursor()
+        # Blobs left without links by folders removed outside the store
+        self._count("blobs", *db.blobs.gc())
+        return True
+
+    def _slice_start(self):
+        self._slice_end = time.monotonic() + SLICE_SECONDS
+        self._slice_entries = 0
+
+    def _slice_done(self):
+        self._slice_entries += 1
+        return self._slice_entries >= SLICE_ENTRIES or time.monotonic() >= self._slice_end
+
+    def _pause(self):
+        """Save the position and rest; returns False if stopped meanwhile"""
+        self._save_cursor()
+        if self._stop.wait(PAUSE_SECONDS):
+            return False
+        self._slice_start()
+        return True
+
+    def _folders(self):
+        """(category, folder name) in a stable order, starting after the saved cursor"""
+        categories = [("breach_logs", BREACH_DIR), ("login_snapshots", GALLERY_DIR)]
+        resume_category = self._cursor.get("category")
+        after = self._cursor.get("after")
+        if resume_category not in self.retention:
+            resume_category, after = None, None
+
+        skipping = resume_category is not None
+        for category, base in categories:
+            if category not in self.retention:
+                continue
+            if skipping and category != resume_category:
+                continue
+            try:
+                with os.scandir(base) as entries:
+                    names = sorted(e.name for e in entries if e.is_dir())
+            except FileNotFoundError:
+                names = []
+            for name in names:
+                if skipping and after is not None and name <= after:
+                    continue
+                yield category, name
+            skipping = False
+
+    # =========================
+    # CLEANING
+    # =========================
+    def _cutoff(self, category):
+        return datetime.now() - timedelta(days=self.retention[category])
+
+    def _clean(self, category, folder):
+        """Delete the expired files of one folder, yielding after every entry examined"""
+        if category == "breach_logs":
+            try:
+                day = datetime.strptime(folder, "%Y-%m-%d")
+            except ValueError:
+                return
+            if day >= self._cutoff(category):
+                return
+            path = os.path.join(BREACH_DIR, folder)
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        db.blobs.release_tree(entry.path)
+                    else:
+                        size = entry.stat().st_size
+                        db.blobs.release(entry.path)
+                        self._count(category, 1, size)
+                    yield
+            shutil.rmtree(path, ignore_errors=True)
+
+        elif category == "login_snapshots":
+            cutoff = self._cutoff(category).timestamp()
+            with os.scandir(os.path.join(GALLERY_DIR, folder)) as entries:
+                for entry in entries:
+                    if entry.name.startswith("login_") and entry.name.endswith(".pack"):
+                        # Prune by each snapshot's own time; a month that starts
+                        # after the cutoff cannot hold an expired one
+                        month = entry.name[6:-5]
+                        try:
+                            starts = datetime.strptime(month, "%Y-%m").timestamp()
+                        except ValueError:
+                            starts = 0
+                        if starts < cutoff:
+                            self._count(category, *self.snapshots.prune(folder, month, cutoff))
+                    elif entry.name.startswith("login_") and entry.is_file():
+                        # Single-image snapshots from before the archives
+                        st = entry.stat()
+                        if st.st_mtime < cutoff:
+                            os.remove(entry.path)
+                            self._count(category, 1, st.st_size)
+                    yield
+
+    def _count(self, category, files, size):
+        self.reclaimed[category]["files"] += files
+        self.reclaimed[category]["bytes"] += size
+
+    def _load_cursor(self):
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cursor(self):
+        try:
+            with open(self.state_file, "w", encoding="utf-8") as f:
+                json.dump(self._cursor, f)
+        except OSError as e:
+            print(f"Retention error: {e}")
+
@@ -0,0 +1,267 @@
+import multiprocessing as mp
+import os
+import threading
+import zlib
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from face_matcher import ENCODING_DIM, TOLERANCE, parse_encoding
+
+INITIAL_SHARD_CAPACITY = 1024
+
+# Worker processes used by the app's gallery; 0 keeps the in-process EncodingIndex
+MATCHER_SHARDS = 0
+
+
+def shard_of(user_id, shards):
+    """Owning shard of a user_id (stable across processes and restarts)"""
+    return zlib.crc32(str(user_id).encode("utf-8")) % shards
+
+
+def top_k_rows(queries, rows, k):
+    """Per-query top-k (row indices, distances) of a batch against one matrix"""
+    sq = (
+        (queries ** 2).sum(axis=1)[:, None]
+        - 2 * queries @ rows.T
+        + (rows ** 2).sum(axis=1)[None, :]
+    )
+    kk = min(k, len(rows))
+    top = np.argpartition(sq, kk - 1, axis=1)[:, :kk]
+    dists = np.sqrt(np.maximum(np.take_along_axis(sq, top, axis=1), 0.0))
+    return top, dists
+
+
+def _shard_worker(conn, shm_name, capacity):
+    """Worker process: answers top-k queries against one shared-memory shard"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        while True:
+            message = conn.recv()
+            kind = message[0]
+
+            if kind == "query":
+                _, queries, count, k = message
+                if count == 0:
+                    empty = (np.empty(0, dtype=np.intp), np.empty(0))
+                    conn.send([empty] * len(queries))
+                    continue
+                matrix = np.ndarray((capacity, ENCODING_DIM), dtype=np.float64, buffer=shm.buf)
+                top, dists = top_k_rows(queries, matrix[:count], k)
+                del matrix
+                conn.send(list(zip(top, dists)))
+
+            elif kind == "attach":
+                # The parent grew the shard into a new shared-memory block
+                _, shm_name, capacity = message
+                shm.close()
+                shm = shared_memory.SharedMemory(name=shm_name)
+                conn.send("ok")
+
+            elif kind == "stop":
+                break
+    finally:
+        shm.close()
+
+
+class _Shard:
+    """Parent-side view of one shard: shared matrix plus its row bookkeeping"""
+
+    def __init__(self, ctx, capacity=INITIAL_SHARD_CAPACITY):
+        self.capacity = capacity
+        self.shm = shared_memory.SharedMemory(create=True, size=capacity * ENCODING_DIM * 8)
+        self.matrix = np.ndarray((capacity, ENCODING_DIM), dtype=np.float64, buffer=self.shm.buf)
+        self.count = 0
+        self.user_ids = []
+        self.row_of = {}
+
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_shard_worker,
+            args=(child, self.shm.name, capacity),
+            daemon=True
+        )
+        self.process.start()
+        child.close()
+
+    def grow(self):
+        capacity = 2 * self.capacity
+        shm = shared_memory.SharedMemory(create=True, size=capacity * ENCODING_DIM * 8)
+        matrix = np.ndarray((capacity, ENCODING_DIM), dtype=np.float64, buffer=shm.buf)
+        matrix[:self.count] = self.matrix[:self.count]
+
+        self.conn.send(("attach", shm.name, capacity))
+        self.conn.recv()
+
+        old = self.shm
+        self.shm, self.matrix, self.capacity = shm, matrix, capacity
+        del matrix
+        old.close()
+        old.unlink()
+
+    def close(self):
+        try:
+            self.conn.send(("stop",))
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=1.0)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.matrix = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+class ShardedMatcher:
+    """Gallery partitioned across worker processes holding shared-memory shards.
+
+    Each user_id is owned by one shard (crc32 hash). Queries are scattered to
+    every worker, each returns its local top-k, and the parent merges them
+    into the global top-k. Inserts and deletes are written by the parent
+    straight into the owning shard's shared matrix between queries.
+
+    Offers the same add/remove/get/verify/identify/match calls as
+    EncodingIndex, so the app can use either as its gallery.
+    """
+
+    def __init__(self, shards=None):
+        shards = shards or os.cpu_count() or 1
+        self._ctx = mp.get_context("spawn")
+        self._shards = [_Shard(self._ctx) for _ in range(shards)]
+        self._records = {}
+        # Serialises writes with in-flight scatter-gather queries
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_dataframe(cls, df, shards=None):
+        matcher = cls(shards)
+        for record in df.to_dict("records"):
+            matcher.add(record)
+        return matcher
+
+    def __len__(self):
+        return sum(shard.count for shard in self._shards)
+
+    def __contains__(self, user_id):
+        return user_id in self._records
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            for shard in self._shards:
+                shard.close()
+            self._shards = []
+
+    # =========================
+    # UPDATES
+    # =========================
+    def add(self, record):
+        """Insert or replace a user in its owning shard"""
+        encoding = parse_encoding(record.get("face_encoding"))
+        if encoding is None:
+            return False
+        user_id = record["user_id"]
+        shard = self._shards[shard_of(user_id, len(self._shards))]
+
+        with self._lock:
+            row = shard.row_of.get(user_id)
+            if row is None:
+                if shard.count == shard.capacity:
+                    shard.grow()
+                row = shard.count
+                shard.count += 1
+                shard.row_of[user_id] = row
+                shard.user_ids.append(user_id)
+            shard.matrix[row] = encoding
+            self._records[user_id] = dict(record)
+        return True
+
+    def add_many(self, records):
+        for record in records:
+            self.add(record)
+
+    def update_record(self, user_id, fields):
+        record = self._records.get(user_id)
+        if record is not None:
+            record.update(fields)
+
+    def remove(self, user_id):
+        shard = self._shards[shard_of(user_id, len(self._shards))]
+        with self._lock:
+            row = shard.row_of.pop(user_id, None)
+            if row is None:
+                return False
+            self._records.pop(user_id, None)
+            last = shard.count - 1
+            if row != last:
+                moved = shard.user_ids[last]
+                shard.matrix[row] = shard.matrix[last]
+                shard.user_ids[row] = moved
+                shard.row_of[moved] = row
+            shard.user_ids.pop()
+            shard.count -= 1
+        return True
+
+    def ensure_projection(self, path=None):
+        """Shards scan exactly; there is no PCA stage to maintain"""
+        return None
+
+    # =========================
+    # LOOKUP
+    # =========================
+    def get(self, user_id):
+        return self._records.get(user_id)
+
+    def verify(self, user_id, encoding, tolerance=TOLERANCE):
+        """1:1 check read directly from the owning shard's shared matrix"""
+        shard = self._shards[shard_of(user_id, len(self._shards))]
+        with self._lock:
+            row = shard.row_of.get(user_id)
+            if row is None:
+                return False, None
+            distance = float(np.linalg.norm(shard.matrix[row] - encoding))
+        return distance <= tolerance, distance
+
+    def match(self, encoding, tolerance=TOLERANCE):
+        result = self.identify(encoding, k=1, tolerance=tolerance)
+        return result["user_id"], result["distance"]
+
+    def identify(self, encoding, k=3, tolerance=TOLERANCE):
+        """Same result format as EncodingIndex.identify"""
+        return self.identify_batch(np.asarray(encoding)[None, :], k, tolerance)[0]
+
+    def identify_batch(self, encodings, k=3, tolerance=TOLERANCE):
+        """Scatter a batch of queries to every shard and merge the global top-k"""
+        queries = np.ascontiguousarray(encodings, dtype=np.float64)
+        with self._lock:
+            for shard in self._shards:
+                shard.conn.send(("query", queries, shard.count, k))
+            replies = [(shard, shard.conn.recv()) for shard in self._shards]
+
+            results = []
+            for q in range(len(queries)):
+                candidates = []
+                for shard, answers in replies:
+                    rows, dists = answers[q]
+                    candidates.extend((float(d), shard.user_ids[r]) for r, d in zip(rows, dists))
+                candidates.sort()
+                results.append(_result(candidates[:k], tolerance))
+        return results
+
+
+def _result(candidates, tolerance):
+    result = {"user_id": None, "distance": None, "margin": None,
+              "candidates": [(uid, d) for d, uid in candidates]}
+    if candidates:
+        result["distance"] = candidates[0][0]
+        if candidates[0][0] <= tolerance:
+            result["user_id"] = candidates[0][1]
+        if len(candidates) > 1:
+            result["margin"] = candidates[1][0] - candidates[0][0]
+    return result
+
@@ -0,0 +1,174 @@
+import bisect
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from file_lock import file_lock
+
+SNAPSHOT_DIR = "images/gallery"
+SNAPSHOT_QUALITY = 85
+SNAPSHOT_PADDING = 0.35       # margin around the face box, as a fraction of its size
+
+# Record header in the archive, followed by the JPEG: capture time, length
+_HEADER = struct.Struct("<dI")
+
+
+class SnapshotStore:
+    """Login snapshots kept as face crops in per-user, per-month archives.
+
+    images/gallery/<uid>/login_<YYYY-MM>.pack holds one record per snapshot:
+    a fixed (time, length) header followed by the JPEG crop. Saving is a
+    single append of header and crop together. The (time, offset, length)
+    index of each pack is built from its headers once and kept in memory;
+    since packs only grow, a later lookup reads just the headers appended
+    since (a pack rewritten by prune has a new inode and is re-indexed).
+    Finding and reading a snapshot is then a single positioned read.
+    prune() drops records by their own capture time, so a month is not kept
+    whole until its newest snapshot expires. Appends and prunes of a user
+    hold a lock on <uid>/.snapshots.lock, so a prune never loses a snapshot
+    appended while it rewrites the archive.
+    """
+
+    def __init__(self, base=SNAPSHOT_DIR, quality=SNAPSHOT_QUALITY, padding=SNAPSHOT_PADDING):
+        self.base = base
+        self.quality = quality
+        self.padding = padding
+        self._index = {}    # pack path -> (inode, bytes indexed, [(time, offset, length), ...])
+        self._index_lock = threading.Lock()
+
+    def _pack_path(self, user_id, month):
+        return os.path.join(self.base, user_id, f"login_{month}.pack")
+
+    def _lock_path(self, user_id):
+        return os.path.join(self.base, user_id, ".snapshots.lock")
+
+    def crop(self, frame, box):
+        """Padded crop around a (top, right, bottom, left) box in frame coordinates"""
+        top, right, bottom, left = box
+        pad_y = int((bottom - top) * self.padding)
+        pad_x = int((right - left) * self.padding)
+        h, w = frame.shape[:2]
+        return frame[max(0, top - pad_y):min(h, bottom + pad_y), max(0, left - pad_x):min(w, right + pad_x)]
+
+    def append(self, user_id, frame, box=None, when=None):
+        """Store one login snapshot (the face crop if box is given)
+        Returns: (month, offset, length)
+        """
+        when = when or time.time()
+        image = self.crop(frame, box) if box is not None else frame
+        ok, jpeg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise ValueError("Snapshot encoding failed")
+
+        month = datetime.fromtimestamp(when).strftime("%Y-%m")
+        pack_path = self._pack_path(user_id, month)
+        os.makedirs(os.path.dirname(pack_path), exist_ok=True)
+
+        data = jpeg.tobytes()
+        with file_lock(self._lock_path(user_id)):
+            with open(pack_path, "ab") as pack:
+                offset = pack.tell() + _HEADER.size
+                pack.write(_HEADER.pack(when, len(data)) + data)
+        return month, offset, len(data)
+
+    def months(self, user_id):
+        """Months with snapshots for a user, newest first"""
+        folder = os.path.join(self.base, user_id)
+        try:
+            with os.scandir(folder) as entries:
+                names = [e.name for e in entries if e.name.startswith("login_") and e.name.endswith(".pack")]
+        except FileNotFoundError:
+            return []
+        return sorted((name[6:-5] for name in names), reverse=True)
+
+    def entries(self, user_id, month):
+        """[(time, offset, length), ...] for one month, oldest first"""
+        pack_path = self._pack_path(user_id, month)
+        with self._index_lock:
+            try:
+                st = os.stat(pack_path)
+            except FileNotFoundError:
+                self._index.pop(pack_path, None)
+                return []
+            inode, indexed, found = self._index.get(pack_path, (None, 0, []))
+            if inode != st.st_ino or st.st_size < indexed:
+                indexed, found = 0, []
+            if st.st_size > indexed:
+                indexed = self._scan(pack_path, indexed, st.st_size, found)
+            self._index[pack_path] = (st.st_ino, indexed, found)
+            return list(found)
+
+    @staticmethod
+    def _scan(pack_path, position, size, found):
+        """Append the records from position on to found
+        Returns: the position after the last complete record
+        """
+        with open(pack_path, "rb") as pack:
+            pack.seek(position)
+            while position + _HEADER.size <= size:
+                when, length = _HEADER.unpack(pack.read(_HEADER.size))
+                offset = position + _HEADER.size
+                if offset + length > size:
+                    break   # torn or still being written
+                found.append((when, offset, length))
+                position = offset + length
+                pack.seek(position)
+        return position
+
+    def find(self, user_id, when):
+        """(month, offset, length) of the user's last snapshot taken at or before when, or None"""
+        month = datetime.fromtimestamp(when).strftime("%Y-%m")
+        found = self.entries(user_id, month)
+        i = bisect.bisect_right([t for t, _, _ in found], when) - 1
+        if i < 0:
+            return None
+        _, offset, length = found[i]
+        return month, offset, length
+
+    def prune(self, user_id, month, cutoff):
+        """Drop the snapshots of one month taken before cutoff (a timestamp)
+        Returns: (snapshots removed, bytes freed)
+        """
+        pack_path = self._pack_path(user_id, month)
+        with file_lock(self._lock_path(user_id)):
+            found = self.entries(user_id, month)
+            keep = [e for e in found if e[0] >= cutoff]
+            if len(keep) == len(found):
+                return 0, 0
+            size = os.path.getsize(pack_path)
+            with self._index_lock:
+                self._index.pop(pack_path, None)
+            if not keep:
+                os.remove(pack_path)
+                return len(found), size
+
+            # Not login_-prefixed, so a retention scan never mistakes it for a snapshot
+            tmp = os.path.join(os.path.dirname(pack_path), f".{month}.{os.getpid()}.tmp")
+            with open(pack_path, "rb") as src, open(tmp, "wb") as dst:
+                for _, offset, length in keep:
+                    src.seek(offset - _HEADER.size)
+                    dst.write(src.read(_HEADER.size + length))
+            os.replace(tmp, pack_path)
+            return len(found) - len(keep), size - os.path.getsize(pack_path)
+
+    def read(self, user_id, month, offset, length):
+        """JPEG bytes of one snapshot"""
+        pack_path = self._pack_path(user_id, month)
+        fd = os.open(pack_path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        try:
+            if hasattr(os, "pread"):
+                return os.pread(fd, length, offset)
+            os.lseek(fd, offset, os.SEEK_SET)
+            return os.read(fd, length)
+        finally:
+            os.close(fd)
+
+    def load(self, user_id, month, offset, length):
+        """Decoded BGR image of one snapshot"""
+        data = self.read(user_id, month, offset, length)
+        return cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
@@ -0,0 +1,36 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# The app's modules live flat in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def synthetic_gallery(size, queries, seed=0, noise=0.01):
+    """Seeded random encodings plus probes near (and a few far from) enrolled faces
+    Returns: (records, vectors, probes)
+    """
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(scale=0.1, size=(size, 128))
+    records = [{"user_id": f"USR-{i:06d}", "face_encoding": v} for i, v in enumerate(vectors)]
+    near = vectors[rng.choice(size, queries)] + rng.normal(scale=noise, size=(queries, 128))
+    far = rng.normal(scale=0.1, size=(max(1, queries // 5), 128))
+    return records, vectors, np.vstack([near, far])
+
+
+@pytest.fixture(scope="session", autouse=True)
+def workdir(tmp_path_factory):
+    """Run in a scratch directory: the app's modules create their files in the cwd
+    (modules that open the database on import are imported inside tests)
+    """
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("workdir"))
+    yield
+    os.chdir(cwd)
+
+
+@pytest.fixture
+def gallery_data():
+    return synthetic_gallery(2000, 50)
@@ -0,0 +1,91 @@
+import os
+import time
+
+import pytest
+
+import blob_store
+from blob_store import BlobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(str(tmp_path / "blobs"))
+
+
+def test_the_blob_directory_is_created_on_first_put(tmp_path, store):
+    assert not os.path.exists(store.base)
+    store.put(b"face", str(tmp_path / "a.jpg"))
+    assert os.path.isdir(store.base)
+
+
+def test_identical_images_share_one_blob_until_the_last_release(tmp_path, store):
+    a, b = str(tmp_path / "u1" / "a.jpg"), str(tmp_path / "u2" / "b.jpg")
+    digest = store.put(b"face", a)
+    assert store.put(b"face", b) == digest
+    blob = store.blob_path(digest)
+    assert os.stat(blob).st_nlink == 3
+    assert store.stats()["blobs"] == 1
+
+    assert store.release(a)
+    assert os.path.exists(blob) and not os.path.exists(a)
+    with open(b, "rb") as f:
+        assert f.read() == b"face"
+    assert store.release(b)
+    assert not os.path.exists(blob)
+    assert not store.release(b)
+
+
+def test_overwriting_a_destination_releases_the_old_blob(tmp_path, store):
+    dest = str(tmp_path / "register_img.jpg")
+    old = store.blob_path(store.put(b"old face", dest))
+    assert store.put(b"old face", dest) == os.path.basename(old)
+    assert os.stat(old).st_nlink == 2
+
+    store.put(b"new face", dest)
+    with open(dest, "rb") as f:
+        assert f.read() == b"new face"
+    assert not os.path.exists(old)
+
+
+def test_gc_spares_young_blobs(tmp_path, store):
+    dest = str(tmp_path / "a.jpg")
+    blob = store.blob_path(store.put(b"face", dest))
+    os.remove(dest)     # removed outside the store: the blob is now an orphan
+    assert store.gc() == (0, 0)
+    assert os.path.exists(blob)
+
+    old = time.time() - blob_store.GC_GRACE_SECONDS - 1
+    os.utime(blob, (old, old))
+    assert store.gc() == (1, 4)
+    assert not os.path.exists(blob)
+
+
+def test_put_refreshes_an_old_orphan_before_linking(tmp_path, store):
+    blob = store.blob_path(store.put(b"face", str(tmp_path / "a.jpg")))
+    os.remove(tmp_path / "a.jpg")
+    old = time.time() - blob_store.GC_GRACE_SECONDS - 1
+    os.utime(blob, (old, old))
+
+    store.put(b"face", str(tmp_path / "b.jpg"))
+    os.remove(tmp_path / "b.jpg")
+    # The orphan was touched by put, so it is inside the grace period again
+    assert store.gc() == (0, 0)
+
+
+def test_put_rewrites_a_blob_removed_before_the_link(tmp_path, store, monkeypatch):
+    real_link = os.link
+    calls = []
+
+    def racing_link(src, dst):
+        if not calls:
+            os.remove(src)      # a concurrent release() or gc() got there first
+        calls.append(dst)
+        return real_link(src, dst)
+
+    monkeypatch.setattr(os, "link", racing_link)
+    dest = str(tmp_path / "a.jpg")
+    digest = store.put(b"face", dest)
+    assert len(calls) == 2
+    with open(dest, "rb") as f:
+        assert f.read() == b"face"
+    assert os.path.samefile(dest, store.blob_path(digest))
@@ -0,0 +1,50 @@
+import multiprocessing as mp
+
+from change_log import ChangeLog, apply_event
+from face_matcher import EncodingIndex
+from conftest import synthetic_gallery
+
+
+def append_many(path, writer, count):
+    log = ChangeLog(path)
+    for i in range(count):
+        log.append("update", f"USR-{writer}-{i}", {"n": i})
+
+
+def test_concurrent_writers_never_reuse_a_seq(tmp_path):
+    path = str(tmp_path / "changes.jsonl")
+    ctx = mp.get_context("spawn")
+    writers = [ctx.Process(target=append_many, args=(path, w, 150)) for w in range(3)]
+    for proc in writers:
+        proc.start()
+    for proc in writers:
+        proc.join()
+        assert proc.exitcode == 0
+
+    events, offset = ChangeLog(path).read_from(0)
+    seqs = [e["seq"] for e in events]
+    assert len(events) == 450
+    assert seqs == list(range(1, 451))
+    assert ChangeLog(path).position() == (450, offset)
+
+
+def test_read_from_offset_only_returns_new_events(tmp_path):
+    log = ChangeLog(str(tmp_path / "changes.jsonl"))
+    log.append("delete", "USR-1")
+    _, offset = log.read_from(0)
+    log.append("delete", "USR-2")
+    events, _ = log.read_from(offset)
+    assert [e["user_id"] for e in events] == ["USR-2"]
+
+
+def test_apply_event_is_idempotent():
+    records, vectors, _ = synthetic_gallery(20, 1)
+    index = EncodingIndex()
+    register = {"seq": 1, "op": "register", "user_id": "USR-000001", "data": records[1]}
+    for _ in range(2):
+        apply_event(index, register)
+        apply_event(index, {"seq": 2, "op": "update", "user_id": "USR-000001", "data": {"name": "A B"}})
+    assert len(index) == 1 and index.get("USR-000001")["name"] == "A B"
+    for _ in range(2):
+        apply_event(index, {"seq": 3, "op": "delete", "user_id": "USR-000001", "data": None})
+    assert len(index) == 0
@@ -0,0 +1,44 @@
+import pytest
+
+import database_manager
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    db = database_manager
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "database.xlsx"))
+    monkeypatch.setattr(db, "IMG_DIR", str(tmp_path / "gallery"))
+    monkeypatch.setattr(db.changes, "path", str(tmp_path / "changes.jsonl"))
+    monkeypatch.setitem(db._cache, "df", None)
+    db.init_database()
+    return db
+
+
+def register(db, user_id, user_type):
+    db.register_user(user_id, "A B", "a@b.cd", 30, "M", "0123456789", "IT", "[]", user_type,
+                     "1234" if user_type == "admin" else None)
+
+
+def test_cached_order_matches_the_file(db):
+    for i, user_type in enumerate(["general_user", "admin", "general_user", "admin"]):
+        register(db, f"USR-{i}", user_type)
+
+    def order():
+        pages = [[r["user_id"] for r in db.get_users_page(t, 0, 10)] for t in ("admin", "general_user")]
+        return pages, list(db.load_db()["user_id"])
+
+    cached = order()
+    db._cache["df"] = None  # force a reload from disk
+    assert order() == cached
+    assert cached[1] == ["USR-1", "USR-3", "USR-0", "USR-2"]
+
+
+def test_updates_and_deletes_by_user_id(db):
+    for i in range(3):
+        register(db, f"USR-{i}", "general_user")
+    assert db.update_users({"USR-1": {"name": "C D"}, "USR-9": {"name": "X"}}) == 1
+    assert db.get_user("USR-1")["name"] == "C D"
+    assert db.delete_users(["USR-0", "USR-9"]) == 1
+    assert db.get_user("USR-0") is None
+    assert db.count_users("general_user") == 2
+    assert db.get_user("USR-2")["user_id"] == "USR-2"
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from encoding_quant import make_codec
+from face_matcher import TOLERANCE, EncodingIndex
+from conftest import synthetic_gallery
+
+
+def measure_accuracy(codec, gallery, queries, tolerance=TOLERANCE):
+    """Compare a quantized codec against float64 matching on the same data
+    Returns: dict with mean distance error and decision/identity agreement
+    """
+    gallery = np.asarray(gallery, dtype=np.float64)
+    codes = codec.fit(gallery).encode(gallery)
+
+    distance_errors = []
+    same_decision = same_identity = 0
+    for query in np.asarray(queries, dtype=np.float64):
+        exact = np.linalg.norm(gallery - query, axis=1)
+        approx = codec.distances(query, codes)
+        distance_errors.append(np.abs(exact - approx).mean())
+
+        exact_best, approx_best = exact.argmin(), approx.argmin()
+        exact_match = exact[exact_best] <= tolerance
+        if exact_match == (approx[approx_best] <= tolerance):
+            same_decision += 1
+            if not exact_match or exact_best == approx_best:
+                same_identity += 1
+
+    n = len(distance_errors)
+    return {
+        "mean_abs_distance_error": float(np.mean(distance_errors)),
+        "decision_agreement": same_decision / n,
+        "identity_agreement": same_identity / n
+    }
+
+
+@pytest.mark.parametrize("storage, max_error, min_agreement", [
+    ("float16", 1e-3, 1.0),
+    ("int8", 1e-2, 0.98)
+])
+def test_scalar_codecs_agree_with_float64(gallery_data, storage, max_error, min_agreement):
+    _, vectors, probes = gallery_data
+    result = measure_accuracy(make_codec(storage), vectors, probes)
+    assert result["mean_abs_distance_error"] < max_error
+    assert result["decision_agreement"] >= min_agreement
+    assert result["identity_agreement"] >= min_agreement
+
+
+def test_pq_codes_are_compact(gallery_data):
+    _, vectors, probes = gallery_data
+    codec = make_codec("pq")
+    result = measure_accuracy(codec, vectors, probes)
+    assert codec.bytes_per_code == 16
+    # PQ distances are coarse approximations; synthetic faces have no structure
+    # for the codebooks to exploit, so only the error is bounded here
+    assert result["mean_abs_distance_error"] < 0.2
+
+
+@pytest.mark.parametrize("storage", ["float64", "float16", "int8", "pq"])
+def test_empty_index_accepts_enrollments(storage):
+    records, vectors, _ = synthetic_gallery(300, 10)
+    index = EncodingIndex(storage)
+    for record in records:
+        assert index.add(record)
+    assert len(index) == len(records)
+    if storage in ("int8", "pq"):
+        assert index.codec.fitted_on > 0
+    assert index.identify(vectors[5])["candidates"]
+
+
+def test_int8_refits_instead_of_clipping():
+    records, vectors, _ = synthetic_gallery(100, 10)
+    index = EncodingIndex("int8")
+    for record in records:
+        index.add(record)
+
+    outlier = vectors[0].copy()
+    outlier[7] = 5 * np.abs(vectors[:, 7]).max()
+    index.add({"user_id": "USR-OUTLIER", "face_encoding": outlier})
+    assert np.allclose(index.encoding("USR-OUTLIER"), outlier, atol=0.05)
+    assert index.identify(outlier)["user_id"] == "USR-OUTLIER"
+    # earlier rows were re-encoded with the wider scale
+    assert np.allclose(index.encoding("USR-000003"), vectors[3], atol=0.05)
+
+
+def test_quantized_index_skips_the_cascade(gallery_data, tmp_path):
+    records, _, probes = gallery_data
+    index = EncodingIndex("int8")
+    for record in records:
+        index.add(record)
+    assert index.ensure_projection(str(tmp_path / "pca.npz")) is None
+    for query in probes:
+        assert index.identify(query)["user_id"] == index.exact_match(query)[0]
+
+
+@pytest.mark.parametrize("storage", ["int8", "pq"])
+def test_bulk_load_fits_the_codec_once(storage, monkeypatch):
+    records, vectors, _ = synthetic_gallery(2000, 10)
+    refits = []
+    real_refit = EncodingIndex._refit_codec
+    monkeypatch.setattr(EncodingIndex, "_refit_codec", lambda self: refits.append(1) or real_refit(self))
+
+    index = EncodingIndex.from_records(records, storage)
+    assert len(index) == len(records)
+    assert refits == []
+    assert index.codec.fitted_on == len(records)
+    assert index.identify(vectors[5])["candidates"]
@@ -0,0 +1,82 @@
+import numpy as np
+
+from face_matcher import TOLERANCE, EncodingIndex
+
+
+def exact_top_k(vectors, ids, query, k):
+    dists = np.linalg.norm(vectors - query, axis=1)
+    order = np.argsort(dists)[:k]
+    return [ids[i] for i in order], dists[order]
+
+
+def build_index(records, tmp_path, projection=True):
+    index = EncodingIndex()
+    for record in records:
+        index.add(record)
+    if projection:
+        index.ensure_projection(str(tmp_path / "pca.npz"))
+    return index
+
+
+def test_cascade_is_active(gallery_data, tmp_path):
+    records, _, _ = gallery_data
+    index = build_index(records, tmp_path)
+    assert index.projection is not None
+
+
+def test_identify_matches_exact_scan(gallery_data, tmp_path):
+    records, vectors, probes = gallery_data
+    ids = [r["user_id"] for r in records]
+    index = build_index(records, tmp_path)
+
+    for query in probes:
+        result = index.identify(query, k=3)
+        expected_ids, expected_dists = exact_top_k(vectors, ids, query, 3)
+
+        # The accept/reject decision is always exact
+        assert (result["user_id"] is not None) == (expected_dists[0] <= TOLERANCE)
+        assert result["user_id"] == index.exact_match(query)[0]
+        if result["user_id"] is not None:
+            # ... and so is the whole top-k once the best face matched
+            assert [uid for uid, _ in result["candidates"]] == expected_ids
+            assert np.allclose([d for _, d in result["candidates"]], expected_dists)
+            assert np.isclose(result["margin"], expected_dists[1] - expected_dists[0])
+
+
+def test_scan_without_projection_matches_exact(gallery_data, tmp_path):
+    records, vectors, probes = gallery_data
+    ids = [r["user_id"] for r in records]
+    index = build_index(records, tmp_path, projection=False)
+
+    for query in probes:
+        expected_ids, expected_dists = exact_top_k(vectors, ids, query, 5)
+        result = index.identify(query, k=5)
+        assert [uid for uid, _ in result["candidates"]] == expected_ids
+        assert np.allclose([d for _, d in result["candidates"]], expected_dists)
+
+
+def test_identify_after_removals(gallery_data, tmp_path):
+    records, vectors, probes = gallery_data
+    index = build_index(records, tmp_path)
+    removed = {r["user_id"] for r in records[::7]}
+    for user_id in removed:
+        assert index.remove(user_id)
+
+    kept = [(r["user_id"], v) for r, v in zip(records, vectors) if r["user_id"] not in removed]
+    ids = [uid for uid, _ in kept]
+    matrix = np.array([v for _, v in kept])
+    for query in probes:
+        result = index.identify(query, k=3)
+        expected_ids, expected_dists = exact_top_k(matrix, ids, query, 3)
+        assert result["user_id"] not in removed
+        if expected_dists[0] <= TOLERANCE:
+            assert [uid for uid, _ in result["candidates"]] == expected_ids
+
+
+def test_verify(gallery_data, tmp_path):
+    records, vectors, _ = gallery_data
+    index = build_index(records, tmp_path)
+    assert index.verify("USR-000003", vectors[3]) == (True, 0.0)
+    matched, distance = index.verify("USR-000003", vectors[4])
+    assert not matched and distance > TOLERANCE
+    assert index.verify("USR-UNKNOWN", vectors[3]) == (False, None)
@@ -0,0 +1,186 @@
+import multiprocessing as mp
+import secrets
+import socket
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import gallery_nodes as nodes
+from face_matcher import EncodingIndex
+from sharded_matcher import shard_of
+from conftest import synthetic_gallery
+
+NUM_NODES = 3
+
+
+def free_ports(count):
+    sockets = [socket.socket() for _ in range(count)]
+    for s in sockets:
+        s.bind(("127.0.0.1", 0))
+    ports = [s.getsockname()[1] for s in sockets]
+    for s in sockets:
+        s.close()
+    return ports
+
+
+@pytest.fixture
+def cluster():
+    records, vectors, probes = synthetic_gallery(600, 30)
+    authkey = secrets.token_bytes(32)
+    ports = free_ports(NUM_NODES)
+    processes = []
+
+    def start(node_id, part=None):
+        part = [r for r in records if shard_of(r["user_id"], NUM_NODES) == node_id] if part is None else part
+        proc = mp.get_context("spawn").Process(
+            target=nodes.serve_node,
+            args=(("127.0.0.1", ports[node_id]), node_id, NUM_NODES, authkey, part),
+            daemon=True
+        )
+        proc.start()
+        processes.append(proc)
+        return proc
+
+    for node_id in range(NUM_NODES):
+        start(node_id)
+    coordinator = nodes.GalleryCoordinator([("127.0.0.1", p) for p in ports], timeout=5.0, authkey=authkey)
+    assert coordinator.wait_ready()
+    try:
+        yield coordinator, start, processes, records, vectors, probes
+    finally:
+        coordinator.close()
+        for proc in processes:
+            proc.terminate()
+
+
+def stop(proc):
+    proc.terminate()
+    proc.join()
+
+
+def owned_by(node_id, start=10000):
+    """A new user id that hashes to node_id"""
+    i = start
+    while shard_of(f"USR-{i:06d}", NUM_NODES) != node_id:
+        i += 1
+    return f"USR-{i:06d}"
+
+
+def test_scatter_gather_matches_single_index(cluster):
+    coordinator, _, _, records, _, probes = cluster
+    reference = EncodingIndex()
+    for record in records:
+        reference.add(record)
+
+    for result, query in zip(coordinator.identify_batch(probes), probes):
+        expected = reference.identify(query)
+        assert result["user_id"] == expected["user_id"]
+        assert not result["partial"]
+
+
+def test_node_loss_is_partial_not_a_mismatch(cluster):
+    coordinator, _, processes, _, vectors, _ = cluster
+    stop(processes[0])
+
+    result = coordinator.identify(vectors[0])
+    assert result["partial"] and len(result["missing_nodes"]) == 1
+
+    lost_user = next(f"USR-{i:06d}" for i in range(600) if shard_of(f"USR-{i:06d}", NUM_NODES) == 0)
+    with pytest.raises(ConnectionError):
+        coordinator.verify(lost_user, vectors[int(lost_user[4:])])
+
+
+def test_writes_to_a_down_node_are_replayed(cluster):
+    coordinator, start, processes, records, vectors, _ = cluster
+    stop(processes[0])
+
+    user_id = owned_by(0)
+    encoding = vectors[0] + 0.5
+    assert coordinator.add({"user_id": user_id, "face_encoding": encoding})
+    victim = next(r["user_id"] for r in records if shard_of(r["user_id"], NUM_NODES) == 0)
+    coordinator.remove(victim)
+    assert coordinator.pending_writes == 2
+    # a queued delete already stops the user from matching
+    assert coordinator.identify(vectors[int(victim[4:])])["user_id"] != victim
+
+    start(0)
+    for link in coordinator.links:
+        link.failed_at = None
+    deadline = time.monotonic() + 10
+    while coordinator.replay() and time.monotonic() < deadline:
+        time.sleep(0.2)
+        coordinator.links[0].failed_at = None
+    assert coordinator.pending_writes == 0
+    assert coordinator.identify(encoding)["user_id"] == user_id
+    assert coordinator.get(victim) is None
+
+
+def test_pending_writes_survive_a_restart(tmp_path):
+    addresses = [("127.0.0.1", p) for p in free_ports(2)]
+    authkey = secrets.token_bytes(32)
+    pending_file = str(tmp_path / "pending.json")
+
+    first = nodes.GalleryCoordinator(addresses, timeout=0.2, authkey=authkey, pending_file=pending_file)
+    first.add({"user_id": "USR-000001", "face_encoding": np.zeros(128)})
+    first.update_record("USR-000001", {"name": "A B"})
+    first.close()
+
+    second = nodes.GalleryCoordinator(addresses, timeout=0.2, authkey=authkey, pending_file=pending_file)
+    try:
+        assert second.pending_writes == 2
+    finally:
+        second.close()
+
+
+def test_connect_is_bounded_by_the_timeout():
+    # A listening socket that never answers the handshake
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    try:
+        link = nodes._NodeLink(server.getsockname(), secrets.token_bytes(32))
+        started = time.monotonic()
+        with pytest.raises(Exception):
+            link.call(("count",), 0.3)
+        assert time.monotonic() - started < 2.0
+    finally:
+        server.close()
+
+
+def test_authkey_is_required(monkeypatch):
+    monkeypatch.delenv(nodes.AUTHKEY_ENV, raising=False)
+    with pytest.raises(RuntimeError):
+        nodes.node_authkey()
+    monkeypatch.setenv(nodes.AUTHKEY_ENV, "short")
+    with pytest.raises(RuntimeError):
+        nodes.node_authkey()
+    monkeypatch.setenv(nodes.AUTHKEY_ENV, "x" * 32)
+    assert nodes.node_authkey() == b"x" * 32
+    assert nodes.parse_address("6200") == (nodes.NODE_HOST, 6200)
+
+
+def test_a_slow_write_does_not_hold_up_lookups(tmp_path):
+    # A node that accepts connections but never answers the handshake
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(1)
+    coordinator = nodes.GalleryCoordinator(
+        [server.getsockname()], timeout=1.0, authkey=secrets.token_bytes(32),
+        pending_file=str(tmp_path / "pending.json")
+    )
+    try:
+        writer = threading.Thread(
+            target=coordinator.add, args=({"user_id": "USR-000001", "face_encoding": np.zeros(128)},))
+        writer.start()
+        time.sleep(0.2)
+        started = time.monotonic()
+        assert coordinator.pending_writes == 0
+        assert coordinator._queued_removals() == set()
+        assert time.monotonic() - started < 0.5
+        writer.join()
+        assert coordinator.pending_writes == 1
+    finally:
+        coordinator.close()
+        server.close()
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+import gallery_watcher
+from change_log import ORIGIN, ChangeLog
+
+
+@pytest.fixture
+def watcher_parts(tmp_path):
+    log = ChangeLog(str(tmp_path / "changes.jsonl"))
+    watcher = gallery_watcher.GalleryWatcher(
+        [{"user_id": "USR-000001", "name": "A B"}],
+        log_path=log.path,
+        db_file=str(tmp_path / "missing.xlsx")
+    )
+    return log, watcher
+
+
+def append_foreign(log, event):
+    """Append an event the way another workstation would"""
+    event = dict(event, origin="other-host/1/abcd", ts=0.0, seq=log.last_seq() + 1)
+    with open(log.path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(event) + "\n")
+
+
+def test_own_events_are_tracked_not_replayed(watcher_parts):
+    log, watcher = watcher_parts
+    log.append("update", "USR-000001", {"last_login": "2026-01-01 10:00:00"})
+    log.append("register", "USR-000002", {"user_id": "USR-000002", "name": "C D"})
+
+    assert watcher.check() == 0
+    assert watcher.drain() == []
+    # ... but still known, so a later workbook diff does not report them again
+    assert watcher._records["USR-000001"]["last_login"] == "2026-01-01 10:00:00"
+    assert "USR-000002" in watcher._records
+
+
+def test_other_instances_events_are_queued(watcher_parts):
+    log, watcher = watcher_parts
+    log.append("update", "USR-000001", {"name": "Own Edit"})
+    append_foreign(log, {"op": "delete", "user_id": "USR-000001", "data": None})
+
+    assert watcher.check() == 1
+    events = watcher.drain()
+    assert [(e["op"], e["origin"]) for e in events] == [("delete", "other-host/1/abcd")]
+    assert events[0]["origin"] != ORIGIN
+
+
+def test_a_batch_of_events_is_one_gallery_version():
+    from conftest import synthetic_gallery
+    from versioned_gallery import VersionedGallery
+
+    records, _, _ = synthetic_gallery(50, 1)
+    gallery = VersionedGallery()
+    gallery.add_many(records[:40])
+    version = gallery.version
+    events = [{"op": "update", "user_id": r["user_id"], "data": {"last_login": "now"}} for r in records[:10]]
+    events += [{"op": "register", "user_id": r["user_id"], "data": r} for r in records[40:]]
+
+    gallery.apply_events(events)
+    gallery.apply_events([])
+    assert gallery.version == version + 1
+    assert len(gallery) == 50
+    assert gallery.get("USR-000003")["last_login"] == "now"
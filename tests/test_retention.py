@@ -0,0 +1,75 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+import retention as retention_module
+from snapshot_store import SnapshotStore
+
+OLD = time.time() - 90 * 86400
+
+
+@pytest.fixture
+def retention(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(retention_module, "PAUSE_SECONDS", 0)
+    monkeypatch.setattr(retention_module, "SLICE_SECONDS", 60)
+    monkeypatch.setattr(retention_module, "SLICE_ENTRIES", 50)
+    return retention_module
+
+
+def make_files(folder, count, prefix, mtime=None):
+    os.makedirs(folder, exist_ok=True)
+    for i in range(count):
+        path = os.path.join(folder, f"{prefix}{i:05d}.jpg")
+        with open(path, "wb") as f:
+            f.write(b"x" * 10)
+        if mtime is not None:
+            os.utime(path, (mtime, mtime))
+
+
+def test_one_large_folder_is_split_into_slices(retention, monkeypatch):
+    make_files("images/gallery/USR-1", 500, "login_", OLD)
+    make_files("images/gallery/USR-1", 20, "login_new_")
+    make_files("images/breach_logs/2000-01-01", 120, "unidentified_")
+
+    scheduler = retention.RetentionScheduler(state_file="state.json")
+    pauses = []
+    real_pause = scheduler._pause
+    monkeypatch.setattr(scheduler, "_pause", lambda: pauses.append(1) or real_pause())
+
+    assert scheduler.run_pass()
+    assert len(pauses) >= (500 + 20 + 120) // 50
+    assert sorted(os.listdir("images/gallery/USR-1")) == [f"login_new_{i:05d}.jpg" for i in range(20)]
+    assert not os.path.exists("images/breach_logs/2000-01-01")
+    assert scheduler.stats()["files"] == 620
+
+
+def test_an_interrupted_pass_resumes_in_the_same_folder(retention, monkeypatch):
+    for user in ("USR-1", "USR-2"):
+        make_files(f"images/gallery/{user}", 200, "login_", OLD)
+
+    first = retention.RetentionScheduler(state_file="state.json")
+    monkeypatch.setattr(first, "_pause", lambda: first._save_cursor() or False)
+    assert not first.run_pass()
+    left = len(os.listdir("images/gallery/USR-1")) + len(os.listdir("images/gallery/USR-2"))
+    assert 0 < left < 400
+
+    second = retention.RetentionScheduler(state_file="state.json")
+    assert second.run_pass()
+    assert os.listdir("images/gallery/USR-1") == os.listdir("images/gallery/USR-2") == []
+
+
+def test_snapshot_archives_are_pruned_by_record_time(retention):
+    store = SnapshotStore("images/gallery")
+    image = np.zeros((40, 40, 3), dtype=np.uint8)
+    now = time.time()
+    for days_ago in (90, 45, 31, 29, 1):
+        store.append("USR-1", image, when=now - days_ago * 86400)
+
+    scheduler = retention.RetentionScheduler(state_file="state.json")
+    assert scheduler.run_pass()
+    kept = [when for month in store.months("USR-1") for when, _, _ in store.entries("USR-1", month)]
+    assert sorted(round((now - when) / 86400) for when in kept) == [1, 29]
+    assert scheduler.stats()["by_category"]["login_snapshots"]["files"] == 3
@@ -0,0 +1,75 @@
+import os
+import time
+
+import numpy as np
+import pytest
+
+from conftest import synthetic_gallery  # first: puts the app modules on sys.path
+from face_matcher import EncodingIndex
+from sharded_matcher import ShardedMatcher, shard_of
+
+
+def benchmark(gallery_size=100000, queries=256, batch=32, shard_counts=None, seed=0):
+    """Query throughput (queries/s) for each shard count on a synthetic gallery"""
+    records, _, probes = synthetic_gallery(gallery_size, queries, seed=seed, noise=0.02)
+    probes = probes[:queries]
+    shard_counts = shard_counts or sorted({1, 2, 4, os.cpu_count() or 1})
+
+    results = {}
+    for shards in shard_counts:
+        with ShardedMatcher(shards) as matcher:
+            matcher.add_many(records)
+            matcher.identify_batch(probes[:batch])  # warm-up
+            started = time.perf_counter()
+            for start in range(0, queries, batch):
+                matcher.identify_batch(probes[start:start + batch])
+            results[shards] = round(queries / (time.perf_counter() - started), 1)
+    return results
+
+
+@pytest.fixture(scope="module")
+def sharded():
+    records, vectors, probes = synthetic_gallery(1500, 40)
+    reference = EncodingIndex()
+    for record in records:
+        reference.add(record)
+    with ShardedMatcher(3) as matcher:
+        matcher.add_many(records)
+        yield matcher, reference, vectors, probes
+
+
+def test_shard_of_is_stable():
+    assert shard_of("USR-000001", 4) == shard_of("USR-000001", 4)
+    assert {shard_of(f"USR-{i:06d}", 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+def test_identify_batch_matches_single_index(sharded):
+    matcher, reference, _, probes = sharded
+    for result, query in zip(matcher.identify_batch(probes, k=3), probes):
+        expected = reference.identify(query, k=3)
+        assert result["user_id"] == expected["user_id"]
+        if expected["user_id"] is not None:
+            assert [uid for uid, _ in result["candidates"]] == [uid for uid, _ in expected["candidates"]]
+            assert np.isclose(result["margin"], expected["margin"])
+
+
+def test_verify_and_remove(sharded):
+    matcher, _, vectors, _ = sharded
+    assert matcher.verify("USR-000010", vectors[10])[0]
+    assert matcher.remove("USR-000010")
+    assert matcher.verify("USR-000010", vectors[10]) == (False, None)
+    assert matcher.identify(vectors[10])["user_id"] != "USR-000010"
+    assert matcher.add({"user_id": "USR-000010", "face_encoding": vectors[10]})
+    assert matcher.identify(vectors[10])["user_id"] == "USR-000010"
+
+
+def test_benchmark_runs():
+    results = benchmark(gallery_size=3000, queries=64, batch=16, shard_counts=[1, 2])
+    assert set(results) == {1, 2}
+    assert all(qps > 0 for qps in results.values())
+
+
+if __name__ == "__main__":
+    # python tests/test_sharded_matcher.py
+    for shards, qps in benchmark().items():
+        print(f"{shards} shard(s): {qps} queries/s")
@@ -0,0 +1,90 @@
+import os
+import time
+
+import numpy as np
+
+from snapshot_store import SnapshotStore
+
+DAY = 86400
+
+
+def frame(seed):
+    return np.random.default_rng(seed).integers(0, 255, (120, 160, 3), dtype=np.uint8)
+
+
+def test_each_snapshot_is_one_record_in_one_file(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    when = time.time()
+    saved = [store.append("USR-1", frame(i), (20, 100, 90, 40), when + i) for i in range(3)]
+
+    month = saved[0][0]
+    assert store.months("USR-1") == [month]
+    assert sorted(os.listdir(tmp_path / "USR-1")) == [".snapshots.lock", f"login_{month}.pack"]
+    entries = store.entries("USR-1", month)
+    assert [(offset, length) for _, offset, length in entries] == [s[1:] for s in saved]
+    assert store.load("USR-1", *saved[1]).shape[2] == 3
+
+
+def test_a_torn_last_record_is_ignored(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    month, offset, length = store.append("USR-1", frame(0))
+    with open(tmp_path / "USR-1" / f"login_{month}.pack", "ab") as pack:
+        pack.write(b"\0" * 5)
+    assert [entry[1:] for entry in store.entries("USR-1", month)] == [(offset, length)]
+
+
+def test_prune_drops_records_by_their_own_time(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    start = time.mktime((2026, 3, 1, 12, 0, 0, 0, 0, -1))
+    saved = [store.append("USR-1", frame(day), when=start + day * DAY) for day in range(20)]
+    month = saved[0][0]
+    cutoff = start + 10 * DAY
+    kept = [store.read("USR-1", *s) for s in saved[10:]]
+
+    removed, freed = store.prune("USR-1", month, cutoff)
+    assert removed == 10 and freed > 0
+    entries = store.entries("USR-1", month)
+    assert [when for when, _, _ in entries] == [start + day * DAY for day in range(10, 20)]
+    # Survivors are still readable at their new offsets
+    assert [store.read("USR-1", month, offset, length) for _, offset, length in entries] == kept
+
+    assert store.prune("USR-1", month, cutoff) == (0, 0)
+    assert store.prune("USR-1", month, start + 30 * DAY)[0] == 10
+    assert store.months("USR-1") == []
+
+
+def test_snapshots_are_found_through_the_index(tmp_path, monkeypatch):
+    store = SnapshotStore(str(tmp_path))
+    start = time.mktime((2026, 3, 1, 12, 0, 0, 0, 0, -1))
+    saved = [store.append("USR-1", frame(i), when=start + i * 60) for i in range(5)]
+    assert store.find("USR-1", start + 2 * 60) == saved[2]
+    assert store.find("USR-1", start + 2 * 60 + 30) == saved[2]
+    assert store.find("USR-1", start - 1) is None
+
+    # Later lookups only read the headers appended since
+    scans = []
+    real_scan = SnapshotStore._scan
+    monkeypatch.setattr(SnapshotStore, "_scan", staticmethod(
+        lambda path, position, size, found: scans.append(position) or real_scan(path, position, size, found)))
+    assert store.find("USR-1", start + 4 * 60) == saved[4]
+    assert scans == []
+    saved.append(store.append("USR-1", frame(5), when=start + 5 * 60))
+    assert store.find("USR-1", start + 5 * 60) == saved[5]
+    assert scans == [saved[4][1] + saved[4][2]]
+
+    month, offset, length = store.find("USR-1", start + 3 * 60)
+    assert store.read("USR-1", month, offset, length) == store.read("USR-1", *saved[3])
+
+
+def test_a_pruned_pack_is_reindexed(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    start = time.mktime((2026, 3, 1, 12, 0, 0, 0, 0, -1))
+    saved = [store.append("USR-1", frame(i), when=start + i * DAY) for i in range(6)]
+    kept = store.read("USR-1", *saved[4])
+    # Pruned through another store instance (another process)
+    SnapshotStore(str(tmp_path)).prune("USR-1", saved[0][0], start + 3 * DAY)
+
+    found = store.find("USR-1", start + 4 * DAY)
+    assert found != saved[4]
+    assert store.read("USR-1", *found) == kept
+    assert len(store.entries("USR-1", saved[0][0])) == 3
@@ -0,0 +1,69 @@
+from user_search import UserSearchIndex
+
+
+def user(user_id, name, email="", phone="", dept="", user_type="general_user"):
+    return {"user_id": user_id, "name": name, "email": email, "phone": phone, "dept": dept, "user_type": user_type}
+
+
+def ids(records):
+    return [r["user_id"] for r in records]
+
+
+def make_index():
+    return UserSearchIndex([
+        user("USR-1", "Alice Smith", "alice@example.com", "5550001111", "Engineering"),
+        user("USR-2", "Bob Jones", "bob@example.com", "5550002222", "Sales"),
+        user("USR-3", "Alan Brown", "alan@corp.org", "5550003333", "Engineering"),
+        user("ADM-1", "Alison Admin", "alison@example.com", "5550004444", "IT", user_type="admin"),
+    ])
+
+
+def test_long_terms_match_substrings_anywhere():
+    index = make_index()
+    assert ids(index.search("mith")) == ["USR-1"]
+    assert ids(index.search("0002")) == ["USR-2"]
+    # Results are sorted by name
+    assert ids(index.search("example.com")) == ["USR-1", "ADM-1", "USR-2"]
+    assert index.search("smithx") == []
+
+
+def test_short_terms_match_word_prefixes_only():
+    index = make_index()
+    assert ids(index.search("al")) == ["USR-3", "USR-1", "ADM-1"]
+    # "li" is inside "alice" but starts no word
+    assert index.search("li") == []
+
+
+def test_every_term_must_match():
+    index = make_index()
+    assert ids(index.search("al engineering")) == ["USR-3", "USR-1"]
+    assert ids(index.search("alice sales")) == []
+
+
+def test_user_type_filter():
+    index = make_index()
+    assert ids(index.search("example", user_type="general_user")) == ["USR-1", "USR-2"]
+    assert ids(index.search("example", user_type="admin")) == ["ADM-1"]
+
+
+def test_updates_and_deletes_are_incremental():
+    index = make_index()
+    index.update("USR-2", {"dept": "Marketing"})
+    assert index.search("sales") == []
+    assert ids(index.search("marketing")) == ["USR-2"]
+    assert ids(index.search("bob")) == ["USR-2"]
+
+    assert index.remove("USR-1")
+    assert index.search("alice") == []
+    assert not index.remove("USR-1")
+    assert len(index) == 3
+
+
+def test_change_log_events():
+    index = make_index()
+    index.apply({"op": "register", "user_id": "USR-9", "data": user("USR-9", "Zed Zulu", dept="Ops")})
+    assert ids(index.search("zulu")) == ["USR-9"]
+    index.apply({"op": "update", "user_id": "USR-9", "data": {"name": "Zed Yankee"}})
+    assert index.search("zulu") == [] and ids(index.search("yankee")) == ["USR-9"]
+    index.apply({"op": "delete", "user_id": "USR-9", "data": None})
+    assert index.search("zed") == []
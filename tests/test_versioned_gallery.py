@@ -0,0 +1,162 @@
+import gc
+import threading
+import time
+import weakref
+
+import numpy as np
+
+from versioned_gallery import VersionedGallery
+from conftest import synthetic_gallery
+
+
+def stress_test(readers=4, enrollments=300, removals=100, gallery_size=2000, seconds=None, seed=0):
+    """Concurrent identify threads against a writer that enrolls and removes users
+
+    Every reader checks that the snapshot it holds is internally consistent
+    and that a user who is never removed is always identified. Returns
+    read/write counts, errors found and how many old versions were still
+    alive after the run (should be ~0: they are freed with their last reader).
+    """
+    records, vectors, _ = synthetic_gallery(gallery_size + enrollments, 1, seed=seed)
+    gallery = VersionedGallery()
+    gallery.add_many(records[:gallery_size])
+    anchor_id, anchor = "USR-000000", vectors[0]
+
+    versions = weakref.WeakSet()
+    stop = threading.Event()
+    reads, errors = [0] * readers, []
+
+    def reader(slot):
+        local = np.random.default_rng(slot)
+        while not stop.is_set():
+            snap = gallery.snapshot()
+            versions.add(snap)
+            if snap.identify(anchor)["user_id"] != anchor_id:
+                errors.append("anchor not identified")
+            probe = vectors[local.integers(len(vectors))]
+            for user_id, _ in snap.identify(probe)["candidates"]:
+                if snap.get(user_id) is None:
+                    errors.append(f"{user_id} in candidates but missing from its snapshot")
+            if len(snap.user_ids) != len(snap):
+                errors.append("user_ids out of step with count")
+            reads[slot] += 1
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for t in threads:
+        t.start()
+
+    started = time.perf_counter()
+    writes = 0
+    for i in range(enrollments):
+        gallery.add(records[gallery_size + i])
+        writes += 1
+        if i < removals:
+            gallery.remove(f"USR-{1 + i:06d}")
+            writes += 1
+    if seconds:
+        time.sleep(max(0.0, seconds - (time.perf_counter() - started)))
+    stop.set()
+    for t in threads:
+        t.join()
+
+    gc.collect()
+    alive = [v for v in versions if v is not gallery.snapshot()]
+    return {
+        "reads": sum(reads),
+        "writes": writes,
+        "versions": gallery.version,
+        "errors": errors[:10],
+        "error_count": len(errors),
+        "old_versions_alive": len(alive),
+        "final_size": len(gallery)
+    }
+
+
+def test_readers_see_consistent_versions():
+    result = stress_test(readers=3, enrollments=150, removals=50, gallery_size=1000)
+    assert result["error_count"] == 0, result["errors"]
+    assert result["reads"] > 0
+    assert result["final_size"] == 1000 + 150 - 50
+    assert result["old_versions_alive"] <= 1
+
+
+def test_snapshot_is_unaffected_by_later_writes():
+    records, vectors, _ = synthetic_gallery(100, 1)
+    gallery = VersionedGallery()
+    gallery.add_many(records[:50])
+    old = gallery.snapshot()
+
+    for record in records[50:]:
+        gallery.add(record)
+    gallery.add({"user_id": "USR-000007", "face_encoding": vectors[7] + 1.0})
+    gallery.remove("USR-000008")
+
+    assert len(old) == 50
+    assert old.identify(vectors[7])["user_id"] == "USR-000007"
+    assert old.identify(vectors[8])["user_id"] == "USR-000008"
+    assert np.allclose(old.encoding("USR-000007"), vectors[7])
+
+
+class SlowLock:
+    """Write lock that is slow to take, so racing writers all reach it"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        time.sleep(0.05)
+        self._lock.acquire()
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+
+def test_racing_adds_of_one_new_user_never_touch_published_rows():
+    records, vectors, _ = synthetic_gallery(60, 1)
+    gallery = VersionedGallery()
+    gallery.add_many(records[:50])
+    gallery._write_lock = SlowLock()
+    published = []
+
+    def enroll(encoding):
+        gallery.add({"user_id": "USR-NEW", "face_encoding": encoding})
+        published.append(gallery.snapshot())
+
+    threads = [threading.Thread(target=enroll, args=(v,)) for v in (vectors[50], vectors[51])]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # Every published version still holds the encoding its record was built with
+    for snap in published:
+        assert np.allclose(snap.encoding("USR-NEW"), snap.get("USR-NEW")["face_encoding"])
+
+
+if __name__ == "__main__":
+    # python tests/test_versioned_gallery.py
+    print(stress_test())
+
+
+def test_ensure_projection_publishes_only_when_it_refits(tmp_path, monkeypatch):
+    records, _, _ = synthetic_gallery(300, 1)
+    path = str(tmp_path / "pca.npz")
+    gallery = VersionedGallery()
+    gallery.add_many(records[:100])
+
+    fitted = gallery.ensure_projection(path)
+    assert fitted is not None
+    for record in records[100:200]:
+        gallery.add(record)
+        assert gallery.ensure_projection(path) is fitted
+    version, current = gallery.version, gallery.snapshot()
+    copies = []
+    monkeypatch.setattr(type(current), "copy", lambda self, **kw: copies.append(1))
+    assert gallery.ensure_projection(path) is fitted
+    assert copies == []
+    monkeypatch.undo()
+    assert gallery.version == version and gallery.snapshot() is current
+
+    gallery.add_many(records[200:])
+    assert gallery.ensure_projection(path) is not fitted
+    assert gallery.version == version + 2
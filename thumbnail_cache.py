@@ -0,0 +1,85 @@
+import hashlib
+import os
+import threading
+
+from PIL import Image
+
+THUMB_DIR = "images/.thumbs"
+THUMB_BUDGET_BYTES = 64 * 1024 * 1024
+THUMB_QUALITY = 85
+
+
+class ThumbnailCache:
+    """Small JPEG thumbnails stored on disk, keyed by source path + mtime + size.
+
+    A miss decodes the source with PIL's draft mode (the JPEG decoder skips
+    straight to a 1/2, 1/4 or 1/8 scale), resizes and stores the result;
+    later visits only read the few-KB thumbnail. Editing or replacing the
+    source changes its mtime and so its key. When the directory grows past
+    the byte budget the least recently used thumbnails are deleted.
+    """
+
+    def __init__(self, folder=THUMB_DIR, budget_bytes=THUMB_BUDGET_BYTES):
+        self.folder = folder
+        self.budget_bytes = budget_bytes
+        self._total = None
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def path_for(self, src, size):
+        st = os.stat(src)
+        key = f"{os.path.abspath(src)}|{st.st_mtime_ns}|{st.st_size}|{size[0]}x{size[1]}"
+        return os.path.join(self.folder, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".jpg")
+
+    def get(self, src, size):
+        """Thumbnail of src resized to size (w, h) as an RGB PIL image"""
+        thumb_path = self.path_for(src, size)
+        try:
+            img = Image.open(thumb_path)
+            img.load()
+            os.utime(thumb_path)   # mark as recently used
+            return img
+        except (FileNotFoundError, OSError):
+            pass
+
+        with Image.open(src) as img:
+            img.draft("RGB", size)
+            thumb = img.convert("RGB").resize(size, Image.Resampling.LANCZOS)
+        self._store(thumb, thumb_path)
+        return thumb
+
+    def _store(self, thumb, thumb_path):
+        tmp = thumb_path + ".tmp"
+        try:
+            thumb.save(tmp, "JPEG", quality=THUMB_QUALITY)
+            os.replace(tmp, thumb_path)
+        except OSError as e:
+            print(f"Thumbnail cache error: {e}")
+            return
+
+        with self._lock:
+            if self._total is None:
+                self._total = sum(e.stat().st_size for e in os.scandir(self.folder) if e.is_file())
+            else:
+                self._total += os.path.getsize(thumb_path)
+            if self._total > self.budget_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Delete least recently used thumbnails down to 80% of the budget"""
+        entries = sorted(
+            (e for e in os.scandir(self.folder) if e.is_file()),
+            key=lambda e: e.stat().st_mtime
+        )
+        total = sum(e.stat().st_size for e in entries)
+        target = self.budget_bytes * 0.8
+        for entry in entries:
+            if total <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                total -= size
+            except OSError:
+                pass
+        self._total = total
@@ -0,0 +1,133 @@
+import re
+
+SEARCH_FIELDS = ("name", "email", "phone", "dept")
+MAX_RESULTS = 500
+
+_WORD = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def _text(value):
+    if value is None or value != value:   # None or NaN from Excel
+        return ""
+    return str(value).lower()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class UserSearchIndex:
+    """In-memory search over name, email, phone and department.
+
+    Terms of 3+ characters use a trigram index (substring match anywhere);
+    shorter terms match word prefixes. Every term must match. The index is
+    updated per user on register/update/delete, never rebuilt.
+    """
+
+    def __init__(self, records=()):
+        self._docs = {}         # user_id -> (search text, words, record)
+        self._trigrams = {}     # trigram -> set of user_ids
+        self._prefixes = {}     # 1-2 char word prefix -> set of user_ids
+        for record in records:
+            self.add(record)
+
+    def __len__(self):
+        return len(self._docs)
+
+    # =========================
+    # UPDATES
+    # =========================
+    def add(self, record):
+        """Insert or re-index a user"""
+        user_id = record["user_id"]
+        self.remove(user_id)
+
+        text = " ".join(_text(record.get(f)) for f in SEARCH_FIELDS) + " " + _text(user_id)
+        words = set(_WORD.findall(text))
+        self._docs[user_id] = (text, words, dict(record))
+        for gram in _trigrams(text):
+            self._trigrams.setdefault(gram, set()).add(user_id)
+        for prefix in self._word_prefixes(words):
+            self._prefixes.setdefault(prefix, set()).add(user_id)
+
+    def update(self, user_id, fields):
+        doc = self._docs.get(user_id)
+        if doc is not None:
+            self.add({**doc[2], **fields})
+
+    def remove(self, user_id):
+        doc = self._docs.pop(user_id, None)
+        if doc is None:
+            return False
+        text, words, _ = doc
+        for gram in _trigrams(text):
+            self._discard(self._trigrams, gram, user_id)
+        for prefix in self._word_prefixes(words):
+            self._discard(self._prefixes, prefix, user_id)
+        return True
+
+    def apply(self, event):
+        """Apply a change-log event (register, update, delete)"""
+        op, user_id = event["op"], event["user_id"]
+        if op == "register":
+            self.add(event["data"])
+        elif op == "update":
+            self.update(user_id, event["data"])
+        elif op == "delete":
+            self.remove(user_id)
+
+    @staticmethod
+    def _word_prefixes(words):
+        return {w[:n] for w in words for n in (1, 2) if len(w) >= n}
+
+    @staticmethod
+    def _discard(postings, key, user_id):
+        ids = postings.get(key)
+        if ids is not None:
+            ids.discard(user_id)
+            if not ids:
+                del postings[key]
+
+    # =========================
+    # QUERIES
+    # =========================
+    def search(self, query, user_type=None, limit=MAX_RESULTS):
+        """Records matching every term of query, sorted by name"""
+        terms = _text(query).split()
+        if not terms:
+            return []
+
+        # Rarest posting list first keeps the intersections small
+        candidates = None
+        for postings in sorted((self._postings(t) for t in terms), key=len):
+            candidates = set(postings) if candidates is None else candidates & postings
+            if not candidates:
+                return []
+
+        results = []
+        for user_id in candidates:
+            text, words, record = self._docs[user_id]
+            if user_type is not None and record.get("user_type") != user_type:
+                continue
+            if all(self._matches(t, text, words) for t in terms):
+                results.append(record)
+        results.sort(key=lambda r: _text(r.get("name")))
+        return results[:limit]
+
+    def _postings(self, term):
+        if len(term) < 3:
+            return self._prefixes.get(term, set())
+        grams = sorted((self._trigrams.get(g, set()) for g in _trigrams(term)), key=len)
+        ids = set(grams[0])
+        for other in grams[1:]:
+            ids &= other
+            if not ids:
+                break
+        return ids
+
+    @staticmethod
+    def _matches(term, text, words):
+        # Trigrams can match out of order, so confirm the substring
+        if len(term) < 3:
+            return any(w.startswith(term) for w in words)
+        return term in text
@@ -0,0 +1,112 @@
+import threading
+
+from change_log import apply_event
+from face_matcher import PCA_FILE, TOLERANCE, EncodingIndex
+
+
+class VersionedGallery:
+    """Copy-on-write versions of an EncodingIndex (RCU-style).
+
+    Readers take the current version with snapshot() - a single reference
+    read, no lock - and may keep using it while writers publish newer ones.
+    Writers serialise on a lock, build the next version from the current
+    one and swap the reference in. A version is freed by reference counting
+    once its last reader drops it.
+
+    Appends of new users share the code matrix with older versions, since
+    they only write rows those versions cannot see; replacing or removing a
+    user copies the matrix first.
+    """
+
+    def __init__(self, index=None):
+        self._current = index if index is not None else EncodingIndex()
+        self._write_lock = threading.Lock()
+        self.version = 0
+
+    @classmethod
+    def from_dataframe(cls, df):
+        return cls(EncodingIndex.from_dataframe(df))
+
+    def snapshot(self):
+        """Immutable view to read from; never modify it"""
+        return self._current
+
+    def _publish(self, change, share_codes=False):
+        """share_codes may be a function of the current version, evaluated under the lock"""
+        with self._write_lock:
+            if callable(share_codes):
+                share_codes = share_codes(self._current)
+            nxt = self._current.copy(share_codes=share_codes)
+            result = change(nxt)
+            self._current = nxt
+            self.version += 1
+        return result
+
+    # =========================
+    # LOOKUP
+    # =========================
+    def __len__(self):
+        return len(self._current)
+
+    def __contains__(self, user_id):
+        return user_id in self._current
+
+    def get(self, user_id):
+        return self._current.get(user_id)
+
+    def verify(self, user_id, encoding, tolerance=TOLERANCE):
+        return self._current.verify(user_id, encoding, tolerance)
+
+    def match(self, encoding, tolerance=TOLERANCE):
+        return self._current.match(encoding, tolerance)
+
+    def identify(self, encoding, k=3, tolerance=TOLERANCE):
+        return self._current.identify(encoding, k=k, tolerance=tolerance)
+
+    # =========================
+    # UPDATES
+    # =========================
+    def add(self, record):
+        # Only a new user is an append; checked against the version being replaced
+        user_id = record["user_id"]
+        return self._publish(lambda index: index.add(record), share_codes=lambda current: user_id not in current)
+
+    def add_many(self, records):
+        """Publish several enrollments as one version"""
+        def change(index):
+            for record in records:
+                index.add(record)
+        self._publish(change)
+
+    def apply_events(self, events):
+        """Publish a batch of change-log events as one version (one copy, not one per event)"""
+        if not events:
+            return
+
+        def change(index):
+            for event in events:
+                apply_event(index, event)
+        self._publish(change, share_codes=all(e["op"] == "update" for e in events))
+
+    def update_record(self, user_id, fields):
+        self._publish(lambda index: index.update_record(user_id, fields), share_codes=True)
+
+    def remove(self, user_id):
+        if user_id not in self._current:
+            return False
+        return self._publish(lambda index: index.remove(user_id))
+
+    def ensure_projection(self, path=PCA_FILE):
+        """Refit the PCA stage on a new version when it is missing or outgrown"""
+        with self._write_lock:
+            # Most calls change nothing: skip the copy of the id maps and records
+            if not self._current.projection_due(path):
+                return self._current.projection
+            nxt = self._current.copy(share_codes=True)
+            # set_projection allocates a fresh reduced matrix, so shared rows stay untouched
+            projection = nxt.ensure_projection(path)
+            if projection is not self._current.projection:
+                self._current = nxt
+                self.version += 1
+        return projection
+
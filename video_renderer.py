@@ -0,0 +1,74 @@
+import tkinter as tk
+
+import customtkinter as ctk
+import cv2
+from PIL import Image, ImageTk
+
+from face_system import reuse_buffer
+
+
+class VideoRenderer(ctk.CTkFrame):
+    """Camera preview that redraws a single PhotoImage in place.
+
+    Frames are resized with OpenCV straight to the on-screen pixel size and
+    pasted into one persistent PhotoImage, so no PIL/CTkImage objects are
+    created per frame and Tk never has to rescale the picture.
+    """
+
+    def __init__(self, master, width=640, height=480, text="", fg_color="#1a1a1a",
+                 text_color="#888888", font=("Segoe UI", 14), **kwargs):
+        super().__init__(master, width=width, height=height, fg_color=fg_color,
+                         corner_radius=15, **kwargs)
+        self.pack_propagate(False)
+
+        # Render at physical pixels so the image is never rescaled for DPI
+        self.size = (
+            round(self._apply_widget_scaling(width)),
+            round(self._apply_widget_scaling(height))
+        )
+        self._photo = ImageTk.PhotoImage("RGB", self.size)
+        self._buffers = {}
+
+        self._label = tk.Label(
+            self,
+            text=text,
+            image="",
+            bd=0,
+            highlightthickness=0,
+            bg=fg_color,
+            fg=text_color,
+            font=font,
+            justify="center"
+        )
+        self._label.place(relx=0.5, rely=0.5, anchor="center")
+        self._showing_video = False
+
+    def show_text(self, text):
+        """Replace the picture with a placeholder message"""
+        self._label.configure(image="", text=text)
+        self._showing_video = False
+
+    def show(self, frame, boxes=()):
+        """Draw a BGR frame; boxes are ((left, top, right, bottom), rgb) in frame coords"""
+        w, h = self.size
+        src_h, src_w = frame.shape[:2]
+
+        resized = reuse_buffer(self._buffers, "resized", (h, w, 3))
+        rgb = reuse_buffer(self._buffers, "rgb", (h, w, 3))
+        cv2.resize(frame, self.size, dst=resized, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(resized, cv2.COLOR_BGR2RGB, dst=rgb)
+
+        fx, fy = w / src_w, h / src_h
+        for (left, top, right, bottom), color in boxes:
+            cv2.rectangle(
+                rgb,
+                (int(left * fx), int(top * fy)),
+                (int(right * fx), int(bottom * fy)),
+                color,
+                3
+            )
+
+        self._photo.paste(Image.frombuffer("RGB", self.size, rgb, "raw", "RGB", 0, 1))
+        if not self._showing_video:
+            self._label.configure(image=self._photo, text="")
+            self._showing_video = True
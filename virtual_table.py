@@ -0,0 +1,195 @@
+from collections import OrderedDict
+
+import customtkinter as ctk
+
+PAGE_SIZE = 50
+CACHED_PAGES = 8
+
+
+class VirtualTable(ctk.CTkFrame):
+    """Table that only builds widgets for the rows on screen.
+
+    A fixed pool of row widgets (as many as fit in the view) is reused:
+    scrolling just changes which records they show. Records come from
+    fetch_page(offset, limit) a page at a time and a few pages are kept
+    in memory, so opening the table costs the same for 50 or 50,000 users.
+
+    columns: [(header, key), ...]; actions: [(text, fg, hover, callback(record)), ...]
+    """
+
+    def __init__(self, master, columns, fetch_page, count, actions=(), column_width=110,
+                 max_chars=12, font_size=10, row_height=44, **kwargs):
+        super().__init__(master, fg_color="transparent", **kwargs)
+        self.columns = columns
+        self.fetch_page = fetch_page
+        self.count = count
+        self.actions = actions
+        self.column_width = column_width
+        self.max_chars = max_chars
+        self.font_size = font_size
+        self.row_height = row_height
+
+        self.total = 0
+        self.first = 0
+        self._pages = OrderedDict()
+        self._rows = []
+
+        self._build_header()
+        body = ctk.CTkFrame(self, fg_color="transparent")
+        body.pack(fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(body, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.body = ctk.CTkFrame(body, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        self.body.bind("<Configure>", self._on_resize)
+        self._bind_wheel(self.body)
+
+        self.refresh()
+
+    # =========================
+    # DATA
+    # =========================
+    def refresh(self):
+        """Drop cached pages and re-read the row count (after edits/deletes)"""
+        self._pages.clear()
+        self.total = self.count()
+        self.first = max(0, min(self.first, self.total - len(self._rows)))
+        self._render()
+
+    def set_source(self, fetch_page, count):
+        """Show a different record source (e.g. search results) from the top"""
+        self.fetch_page = fetch_page
+        self.count = count
+        self.first = 0
+        self.refresh()
+
+    def _record(self, index):
+        page, slot = divmod(index, PAGE_SIZE)
+        rows = self._pages.get(page)
+        if rows is None:
+            rows = self.fetch_page(page * PAGE_SIZE, PAGE_SIZE)
+            self._pages[page] = rows
+            if len(self._pages) > CACHED_PAGES:
+                self._pages.popitem(last=False)
+        else:
+            self._pages.move_to_end(page)
+        return rows[slot] if slot < len(rows) else None
+
+    # =========================
+    # WIDGETS
+    # =========================
+    def _build_header(self):
+        header_row = ctk.CTkFrame(self, fg_color="#2a2a2a", corner_radius=10)
+        header_row.pack(fill="x", pady=5)
+        headers = [header for header, _ in self.columns]
+        if self.actions:
+            headers.append("Actions")
+        for i, header in enumerate(headers):
+            ctk.CTkLabel(
+                header_row,
+                text=header,
+                font=("Segoe UI", self.font_size + 1, "bold"),
+                text_color="#ffffff",
+                width=self.column_width
+            ).grid(row=0, column=i, padx=3, pady=10)
+
+    def _make_row(self):
+        frame = ctk.CTkFrame(self.body, corner_radius=10, height=self.row_height - 4)
+        labels = []
+        for i in range(len(self.columns)):
+            label = ctk.CTkLabel(
+                frame,
+                text="",
+                font=("Segoe UI", self.font_size),
+                text_color="#cccccc",
+                width=self.column_width
+            )
+            label.grid(row=0, column=i, padx=3, pady=8)
+            self._bind_wheel(label)
+            labels.append(label)
+
+        buttons = []
+        if self.actions:
+            action_frame = ctk.CTkFrame(frame, fg_color="transparent")
+            action_frame.grid(row=0, column=len(self.columns), padx=3, pady=5)
+            for text, fg, hover, _ in self.actions:
+                button = ctk.CTkButton(
+                    action_frame,
+                    text=text,
+                    fg_color=fg,
+                    hover_color=hover,
+                    width=35,
+                    height=30,
+                    corner_radius=5
+                )
+                button.pack(side="left", padx=2)
+                buttons.append(button)
+        self._bind_wheel(frame)
+        return frame, labels, buttons
+
+    def _on_resize(self, event):
+        visible = max(1, event.height // self.row_height)
+        if visible == len(self._rows):
+            return
+        while len(self._rows) < visible:
+            self._rows.append(self._make_row())
+        while len(self._rows) > visible:
+            self._rows.pop()[0].destroy()
+        self.first = max(0, min(self.first, self.total - visible))
+        self._render()
+
+    def _render(self):
+        for slot, (frame, labels, buttons) in enumerate(self._rows):
+            index = self.first + slot
+            record = self._record(index) if index < self.total else None
+            if record is None:
+                frame.pack_forget()
+                continue
+
+            frame.configure(fg_color="#1f1f1f" if index % 2 == 0 else "#252525")
+            for label, (_, key) in zip(labels, self.columns):
+                value = record.get(key, "")
+                text = "" if value is None or value != value else str(value)
+                if len(text) > self.max_chars:
+                    text = text[:self.max_chars] + ".."
+                label.configure(text=text)
+            for button, (_, _, _, callback) in zip(buttons, self.actions):
+                button.configure(command=lambda r=record, cb=callback: cb(r))
+            if not frame.winfo_ismapped():
+                frame.pack(fill="x", pady=2)
+
+        visible = max(1, len(self._rows))
+        if self.total > visible:
+            self.scrollbar.set(self.first / self.total, (self.first + visible) / self.total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # =========================
+    # SCROLLING
+    # =========================
+    def scroll_to(self, first):
+        first = max(0, min(int(first), self.total - len(self._rows)))
+        if first != self.first:
+            self.first = first
+            self._render()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * self.total)
+        elif args[0] == "scroll":
+            step = len(self._rows) if args[2] == "pages" else 1
+            self.scroll_to(self.first + int(args[1]) * step)
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4:
+            delta = -1
+        elif getattr(event, "num", None) == 5:
+            delta = 1
+        else:
+            delta = -1 if event.delta > 0 else 1
+        self.scroll_to(self.first + 3 * delta)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", self._on_wheel)
+        widget.bind("<Button-5>", self._on_wheel)